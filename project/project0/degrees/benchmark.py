@@ -0,0 +1,520 @@
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+import degrees
+import graph
+import landmarks
+import nameindex
+import util
+
+# Number of random person pairs searched per benchmark
+QUERIES = 50
+
+# Push/pop operations per frontier benchmark; list-backed frontiers are
+# quadratic, so they only get a small sample
+OPERATIONS = 1000000
+LIST_OPERATIONS = 20000
+
+# Names in the synthetic index of the names benchmark
+SYNTHETIC_NAMES = 1000000
+
+
+def main():
+    if len(sys.argv) not in [2, 3] or sys.argv[1] not in BENCHMARKS:
+        choices = "|".join(BENCHMARKS)
+        sys.exit(f"Usage: python benchmark.py [{choices}] [directory]")
+    directory = sys.argv[2] if len(sys.argv) == 3 else "large"
+    BENCHMARKS[sys.argv[1]](directory)
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns count random (source, target) pairs of people
+    who starred in at least one movie.
+    """
+    rng = random.Random(seed)
+    cast = cast_ids()
+    return [(rng.choice(cast), rng.choice(cast)) for _ in range(count)]
+
+
+def cast_ids():
+    """
+    Returns the sorted ids of people who starred in at least one movie,
+    from whichever graph degrees has loaded.
+    """
+    compact = degrees.graph
+    if compact is not None:
+        offsets = compact.person_offsets
+        return [compact.person_ids[i] for i in range(len(offsets) - 1)
+                if offsets[i] < offsets[i + 1]]
+    return sorted(
+        person_id for person_id, person in degrees.people.items()
+        if person["movies"]
+    )
+
+
+def time_search(search, pairs):
+    """
+    Runs search over every pair and returns (seconds, path lengths).
+    """
+    lengths = []
+    start = time.perf_counter()
+    for source, target in pairs:
+        path = search(source, target)
+        lengths.append(None if path is None else len(path))
+    return time.perf_counter() - start, lengths
+
+
+def benchmark_search(directory):
+    """
+    Compares single-ended and bidirectional BFS on random pairs.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    pairs = random_pairs(QUERIES)
+
+    results = {}
+    for name, search in degrees.SEARCHES.items():
+        if name == "landmarks":
+            # Needs the compact graph, see the landmarks benchmark
+            continue
+        seconds, lengths = time_search(search, pairs)
+        results[name] = lengths
+        print(f"{name:>14}: {seconds:8.3f}s total, "
+              f"{1000 * seconds / len(pairs):8.2f}ms per query")
+
+    # Every search must agree on the degrees of separation
+    if len({tuple(lengths) for lengths in results.values()}) != 1:
+        sys.exit("Searches disagree on path lengths.")
+    connected = [length for length in results["bfs"] if length is not None]
+    print(f"{len(connected)}/{len(pairs)} pairs connected, "
+          f"longest path {max(connected, default=0)} degrees.")
+
+
+def benchmark_lean(directory):
+    """
+    Compares shortest_path with the lean BFS on the longest-distance
+    pairs out of a larger random sample.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    pairs = random_pairs(10 * QUERIES)
+    lengths = [degrees.bidirectional_path(source, target)
+               for source, target in pairs]
+    ranked = sorted(
+        (len(path), pair) for path, pair in zip(lengths, pairs)
+        if path is not None
+    )
+    pairs = [pair for length, pair in ranked[-QUERIES:]]
+    print(f"{len(pairs)} pairs, {ranked[-QUERIES][0]}-{ranked[-1][0]} degrees")
+
+    results = []
+    for search in [degrees.shortest_path, degrees.lean_shortest_path]:
+        seconds, lengths = time_search(search, pairs)
+        results.append(lengths)
+        print(f"{search.__name__:>18}: {1000 * seconds / len(pairs):8.2f}ms "
+              f"per query")
+    if results[0] != results[1]:
+        sys.exit("Searches disagree on path lengths.")
+
+
+def benchmark_compact(directory):
+    """
+    Compares memory and search time of the dict and compact graphs.
+    """
+    print("Loading dicts...")
+    tracemalloc.start()
+    degrees.load_data(directory)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    pairs = random_pairs(QUERIES)
+    dict_seconds, dict_lengths = time_search(degrees.bidirectional_path, pairs)
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.names.clear()
+
+    print("Loading compact graph...")
+    tracemalloc.start()
+    degrees.load_data(directory, compact=True, cache=False)
+    compact_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    compact_seconds, compact_lengths = time_search(
+        degrees.graph.shortest_path, pairs
+    )
+
+    if dict_lengths != compact_lengths:
+        sys.exit("Graphs disagree on path lengths.")
+    print(f"{'dict':>8}: {dict_bytes / 2 ** 20:9.1f} MiB, "
+          f"{1000 * dict_seconds / len(pairs):8.2f}ms per query")
+    print(f"{'compact':>8}: {compact_bytes / 2 ** 20:9.1f} MiB, "
+          f"{1000 * compact_seconds / len(pairs):8.2f}ms per query")
+    print(f"Memory reduced {dict_bytes / compact_bytes:.1f}x.")
+
+
+def benchmark_snapshot(directory):
+    """
+    Times compact graph loading from CSV and from a warm snapshot.
+    """
+    path = os.path.join(directory, graph.SNAPSHOT_FILE)
+    if os.path.exists(path):
+        os.remove(path)
+
+    start = time.perf_counter()
+    graph.parse_graph(directory)
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.load_graph(directory)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph.load_graph(directory)
+    warm = time.perf_counter() - start
+
+    print(f"{'parse CSV':>18}: {parse:8.3f}s")
+    print(f"{'cold (+snapshot)':>18}: {cold:8.3f}s")
+    print(f"{'warm snapshot':>18}: {warm:8.3f}s")
+    print(f"Snapshot is {os.path.getsize(path) / 2 ** 20:.1f} MiB.")
+
+
+def benchmark_batch(directory):
+    """
+    Compares answering queries one by one with grouping them by source.
+    """
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    rng = random.Random(0)
+    cast = cast_ids()
+    sources = rng.sample(cast, QUERIES // 10)
+    pairs = [(source, rng.choice(cast)) for source in sources
+             for _ in range(QUERIES)]
+
+    single_seconds, single_lengths = time_search(
+        degrees.bidirectional_path, pairs
+    )
+
+    start = time.perf_counter()
+    batch_lengths = []
+    for source in sources:
+        targets = [target for other, target in pairs if other == source]
+        paths = degrees.paths_from(source, targets)
+        batch_lengths.extend(
+            None if paths[target] is None else len(paths[target])
+            for target in targets
+        )
+    batch_seconds = time.perf_counter() - start
+
+    if single_lengths != batch_lengths:
+        sys.exit("Batch and single queries disagree on path lengths.")
+    print(f"{len(pairs)} queries from {len(sources)} sources")
+    print(f"{'one by one':>12}: {single_seconds:8.3f}s")
+    print(f"{'by source':>12}: {batch_seconds:8.3f}s")
+
+
+def benchmark_parallel(directory):
+    """
+    Measures batch throughput as the number of worker processes grows.
+    """
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    searches = [(source, {target}) for source, target in random_pairs(
+        QUERIES * multiprocessing.cpu_count()
+    )]
+
+    baseline = None
+    workers = 1
+    while workers <= multiprocessing.cpu_count():
+        pool = degrees.start_pool(workers)
+        start = time.perf_counter()
+        degrees.search_all(searches, pool)
+        seconds = time.perf_counter() - start
+        if pool is not None:
+            pool.close()
+            pool.join()
+        baseline = baseline or seconds
+        print(f"{workers:>3} workers: {len(searches) / seconds:9.1f} "
+              f"queries/s, {baseline / seconds:5.2f}x speedup")
+        workers *= 2
+
+
+def benchmark_landmarks(directory):
+    """
+    Reports landmark index build time and size, and compares landmark
+    searches and degree-only queries with bidirectional BFS.
+    """
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    compact = degrees.graph
+
+    start = time.perf_counter()
+    index = landmarks.LandmarkIndex.build(compact)
+    build = time.perf_counter() - start
+    size = len(index.distances) * (len(compact.person_offsets) - 1)
+    print(f"Built {len(index.landmarks)} landmarks in {build:.2f}s, "
+          f"{size / 2 ** 20:.1f} MiB.")
+
+    pairs = random_pairs(QUERIES)
+    bfs_seconds, bfs_lengths = time_search(compact.shortest_path, pairs)
+    alt_seconds, alt_lengths = time_search(index.shortest_path, pairs)
+    start = time.perf_counter()
+    degree_lengths = [index.degrees(source, target)
+                      for source, target in pairs]
+    degree_seconds = time.perf_counter() - start
+    if not bfs_lengths == alt_lengths == degree_lengths:
+        sys.exit("Landmark queries disagree with BFS.")
+
+    exact = 0
+    for source, target in pairs:
+        bounds = index.bounds(compact.person_index(source),
+                              compact.person_index(target))
+        exact += bounds is None or bounds[0] == bounds[1]
+    for name, seconds in [("bidirectional", bfs_seconds),
+                          ("landmark path", alt_seconds),
+                          ("degrees only", degree_seconds)]:
+        print(f"{name:>14}: {1000 * seconds / len(pairs):8.2f}ms per query, "
+              f"{bfs_seconds / seconds:6.1f}x")
+    print(f"{exact}/{len(pairs)} answered by landmark bounds alone.")
+
+
+def load_and_measure(directory, compact, prune, results):
+    """
+    Loads directory in a fresh process and reports its peak RSS.
+    """
+    start = time.perf_counter()
+    degrees.load_data(directory, compact=compact, cache=False, prune=prune)
+    seconds = time.perf_counter() - start
+    if compact:
+        count = len(degrees.graph.person_offsets) - 1
+    else:
+        count = len(degrees.people)
+    # ru_maxrss is in KiB on Linux but bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        peak *= 1024
+    results.put((seconds, count, peak))
+
+
+def benchmark_prune(directory):
+    """
+    Reports peak RSS and load time with and without pruning.
+    """
+    context = multiprocessing.get_context("spawn")
+    for compact in [False, True]:
+        for prune in [False, True]:
+            results = context.Queue()
+            process = context.Process(
+                target=load_and_measure,
+                args=(directory, compact, prune, results)
+            )
+            process.start()
+            seconds, count, peak = results.get()
+            process.join()
+            name = ("compact" if compact else "dict") + (
+                " pruned" if prune else ""
+            )
+            print(f"{name:>14}: {peak / 2 ** 20:8.1f} MiB peak RSS, "
+                  f"{count:>9} people, {seconds:6.2f}s")
+
+
+def misspell(name, rng):
+    """
+    Returns name with one random character deleted, doubled or replaced.
+    """
+    i = rng.randrange(len(name))
+    edit = rng.choice(["delete", "double", "replace"])
+    if edit == "delete":
+        return name[:i] + name[i + 1:]
+    if edit == "double":
+        return name[:i + 1] + name[i:]
+    return name[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[i + 1:]
+
+
+def benchmark_names(directory):
+    """
+    Times exact, prefix and fuzzy name lookups on the compact graph,
+    and how often a misspelled name is recovered, then the same fuzzy
+    lookups over a million names.
+    """
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    start = time.perf_counter()
+    index = degrees.graph.name_index()
+    print(f"Indexed {len(index.keys)} names in "
+          f"{time.perf_counter() - start:.2f}s.")
+    rng = random.Random(0)
+    time_lookups(index, rng, degrees.person_ids_for_name)
+
+    names = synthetic_names(index.keys, SYNTHETIC_NAMES, rng)
+    start = time.perf_counter()
+    index = nameindex.NameIndex(names)
+    print(f"Indexed {len(names)} synthetic names in "
+          f"{time.perf_counter() - start:.2f}s.")
+    time_lookups(index, rng)
+
+
+def synthetic_names(keys, count, rng):
+    """
+    Returns count distinct names in sorted order, each the first word
+    of one known name and the rest of another, misspelled until new.
+    """
+    firsts = [key.split(" ", 1)[0] for key in keys]
+    lasts = [key.split(" ", 1)[-1] for key in keys]
+    names = set()
+    while len(names) < count:
+        name = f"{rng.choice(firsts)} {rng.choice(lasts)}"
+        while name in names:
+            name = misspell(name, rng)
+        names.add(name)
+    return sorted(names)
+
+
+def time_lookups(index, rng, exact=None):
+    """
+    Times lookups of random names in index, and of misspellings of
+    them, printing how many lookups found the intended name.
+    """
+    names = [index.keys[rng.randrange(len(index.keys))]
+             for _ in range(10 * QUERIES)]
+    typos = [misspell(name, rng) for name in names]
+
+    lookups = [
+        ("prefix", lambda name, typo: index.prefix(name[:-1])),
+        ("fuzzy 1", lambda name, typo: index.fuzzy(typo, 1)),
+        ("fuzzy 2", lambda name, typo: index.fuzzy(typo, 2)),
+    ]
+    if exact is not None:
+        lookups.insert(0, ("exact", lambda name, typo: exact(name)))
+    for label, lookup in lookups:
+        found = 0
+        start = time.perf_counter()
+        for name, typo in zip(names, typos):
+            found += name in lookup(name, typo) or label == "exact"
+        seconds = time.perf_counter() - start
+        print(f"{label:>8}: {1000 * seconds / len(names):8.3f}ms per lookup, "
+              f"{found}/{len(names)} found")
+
+
+def repeated_search_paths(source, target, limit, budget):
+    """
+    Enumerates shortest paths the naive way, re-running a search from
+    every neighbor to see whether it is one step closer to target.
+
+    Gives up after budget seconds, returning None.
+    """
+    deadline = time.perf_counter() + budget
+    path = degrees.bidirectional_path(source, target)
+    if path is None:
+        return []
+    paths = []
+
+    def extend(person_id, remaining, prefix):
+        if len(paths) == limit or time.perf_counter() > deadline:
+            return
+        if remaining == 0:
+            paths.append(prefix)
+            return
+        for movie_id, neighbor in sorted(
+            degrees.neighbors_for_person(person_id)
+        ):
+            if len(paths) == limit or time.perf_counter() > deadline:
+                return
+            rest = degrees.bidirectional_path(neighbor, target)
+            if rest is not None and len(rest) == remaining - 1:
+                extend(neighbor, remaining - 1,
+                       prefix + [(movie_id, neighbor)])
+
+    extend(source, len(path), [])
+    if time.perf_counter() > deadline:
+        return None
+    return paths
+
+
+def benchmark_paths(directory):
+    """
+    Compares enumerating shortest paths from one layered search with
+    re-running a search per step.
+    """
+    print("Loading data...")
+    degrees.load_data(directory, compact=True)
+    # The repeated searches are slow, so keep this sample small
+    pairs = random_pairs(QUERIES // 10)
+    limit = 20
+    budget = 30
+
+    start = time.perf_counter()
+    layered = [degrees.shortest_paths(source, target, limit)
+               for source, target in pairs]
+    layered_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    repeated = [repeated_search_paths(source, target, limit, budget)
+                for source, target in pairs]
+    repeated_seconds = time.perf_counter() - start
+
+    for paths, naive in zip(layered, repeated):
+        if naive is not None and len(paths) != len(naive):
+            sys.exit("Path enumerations disagree.")
+    total = sum(len(paths) for paths in layered)
+    gave_up = repeated.count(None)
+    print(f"{total} paths over {len(pairs)} pairs (at most {limit} each)")
+    print(f"{'layered':>9}: {1000 * layered_seconds / len(pairs):9.2f}ms "
+          f"per pair")
+    print(f"{'repeated':>9}: {1000 * repeated_seconds / len(pairs):9.2f}ms "
+          f"per pair" + (f", {gave_up} pairs stopped after {budget}s"
+                         if gave_up else ""))
+
+
+def time_frontier(frontier, operations):
+    """
+    Pushes operations // 2 nodes onto frontier then pops them all,
+    checking contains_state along the way. Returns operations per second.
+    """
+    pushes = operations // 2
+    nodes = [util.Node((None, str(i)), None, None) for i in range(pushes)]
+    start = time.perf_counter()
+    for node in nodes:
+        frontier.add(node)
+    for node in nodes:
+        frontier.contains_state(node.state)
+        frontier.remove()
+    return operations / (time.perf_counter() - start)
+
+
+def benchmark_frontier(directory):
+    """
+    Measures push/pop throughput of every frontier class.
+    """
+    frontiers = [
+        (util.StackFrontier, LIST_OPERATIONS),
+        (util.QueueFrontier, LIST_OPERATIONS),
+        (util.DequeStackFrontier, OPERATIONS),
+        (util.DequeQueueFrontier, OPERATIONS),
+    ]
+    for frontier, operations in frontiers:
+        rate = time_frontier(frontier(), operations)
+        print(f"{frontier.__name__:>18}: {operations:>8} ops, "
+              f"{rate:12,.0f} ops/s")
+
+
+BENCHMARKS = {
+    "search": benchmark_search,
+    "frontier": benchmark_frontier,
+    "compact": benchmark_compact,
+    "snapshot": benchmark_snapshot,
+    "batch": benchmark_batch,
+    "parallel": benchmark_parallel,
+    "landmarks": benchmark_landmarks,
+    "lean": benchmark_lean,
+    "prune": benchmark_prune,
+    "names": benchmark_names,
+    "paths": benchmark_paths,
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,15 @@
+import argparse
 import csv
+import json
+import multiprocessing
 import sys
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import bridging_cast, load_graph
+from landmarks import load_index
+from nameindex import NameIndex
+from util import (Node, DequeQueueFrontier, all_shortest_paths,
+                  bidirectional_search, breadth_first_paths)
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,15 +20,46 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Sorted index of the lowercased names, for prefix and fuzzy lookups
+name_index = None
 
-def load_data(directory):
+# Compact integer-indexed graph, used instead of the dicts when loaded
+graph = None
+
+# Landmark distance index over the compact graph, if loaded
+landmark_index = None
+
+# Most shortest paths enumerated between two people
+MAX_PATHS = 10000
+
+# Batch queries are grouped by source this many lines at a time
+BATCH_SIZE = 1000
+
+
+def load_data(directory, compact=False, cache=True, prune=False):
     """
     Load data from CSV files into memory.
+
+    If compact, build an array-backed Graph instead of the dicts above,
+    reusing (or writing) a binary snapshot of it when cache is set.
+    If prune, stream stars.csv first and only load the people and movies
+    that can be on a path, so people who starred in nothing (or only in
+    single-star movies) are not found at all.
     """
+    if compact:
+        global graph
+        graph = load_graph(directory, cache=cache, prune=prune)
+        return
+
+    if prune:
+        cast, casts = bridging_cast(directory)
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
+            if prune and row["id"] not in cast:
+                continue
             people[row["id"]] = {
                 "name": row["name"],
                 "birth": row["birth"],
@@ -35,6 +74,8 @@ def load_data(directory):
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
+            if prune and row["id"] not in casts:
+                continue
             movies[row["id"]] = {
                 "title": row["title"],
                 "year": row["year"],
@@ -45,22 +86,66 @@ def load_data(directory):
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
+            if prune and row["movie_id"] not in casts:
+                continue
             try:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
                 movies[row["movie_id"]]["stars"].add(row["person_id"])
             except KeyError:
                 pass
 
+    # Index names for prefix and fuzzy lookups
+    global name_index
+    name_index = NameIndex(sorted(names))
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        description="Find the degrees of separation between two actors."
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=sorted(SEARCHES), default="bfs",
+                        help="search algorithm used to find the path")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph in integer-indexed arrays")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the compact graph's binary snapshot")
+    parser.add_argument("--prune", action="store_true",
+                        help="skip people and movies that cannot be on "
+                             "a path (such people are then not found)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="answer tab-separated name pairs from FILE "
+                             "('-' for stdin) as JSON lines")
+    parser.add_argument("--paths", type=int, metavar="K",
+                        help="show up to K shortest paths, newest "
+                             "movies first")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes answering batch queries; they "
+                             "share the loaded graph by forking")
+    args = parser.parse_args()
+    directory = args.directory
+    search = SEARCHES[args.search]
+    if args.search == "landmarks" and not args.compact:
+        parser.error("--search landmarks requires --compact")
+
+    # Keep stdout clean for JSON lines in batch mode
+    log = sys.stderr if args.batch else sys.stdout
 
     # Load data from files into memory
-    print("Loading data...")
-    load_data(directory)
-    print("Data loaded.")
+    print("Loading data...", file=log)
+    load_data(directory, compact=args.compact, cache=not args.no_cache,
+              prune=args.prune)
+    if args.search == "landmarks":
+        load_landmarks(directory, args.prune)
+    print("Data loaded.", file=log)
+
+    if args.batch:
+        if args.batch == "-":
+            run_batch(sys.stdin, sys.stdout, args.workers)
+        else:
+            with open(args.batch, encoding="utf-8") as f:
+                run_batch(f, sys.stdout, args.workers)
+        return
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,19 +154,32 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if args.paths:
+        paths = newest_paths(source, target, args.paths)
+        if not paths:
+            print("Not connected.")
+        for number, path in enumerate(paths, 1):
+            print(f"Path {number}:")
+            print_path(source, path)
+        return
+
+    path = search(source, target)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = person_details(path[i][1])[0]
+        person2 = person_details(path[i + 1][1])[0]
+        movie = movie_details(path[i + 1][0])[0]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
 def shortest_path(source, target):
@@ -94,9 +192,13 @@ def shortest_path(source, target):
 
     # TODO
 
+    # The compact graph runs its BFS over integer indices
+    if graph is not None:
+        return graph.paths_from(source, [target])[target]
+
     # Use Bread-First-Search (Queue Frontier FIFO) for shortest path
-    # Declare Frontier Class
-    check_frontier = QueueFrontier()
+    # Declare Frontier Class (deque backed, so removing is O(1))
+    check_frontier = DequeQueueFrontier()
 
     # Declare Initial Node
     initial_node = Node((None, source), None, "Inital")
@@ -146,20 +248,260 @@ def shortest_path(source, target):
                     check_frontier.add(neighbor_node)
 
 
+def lean_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    Same BFS as shortest_path, but tests for the target as people are
+    queued rather than when they are removed, keeps parents in a flat
+    dict instead of Node objects, and builds the path in linear time.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Parents map a person to (previous person, movie)
+    parents = {source: None}
+    frontier = deque([source])
+    while frontier:
+        person_id = frontier.popleft()
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (person_id, movie_id)
+            if neighbor == target:
+                # Walk back to source, then reverse once
+                path = []
+                while parents[neighbor] is not None:
+                    previous, movie_id = parents[neighbor]
+                    path.append((movie_id, neighbor))
+                    neighbor = previous
+                path.reverse()
+                return path
+            frontier.append(neighbor)
+
+    # Everyone reachable has been seen, so no connection
+    return None
+
+
+def bidirectional_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends.
+
+    Each step expands one whole layer of the smaller frontier, so the
+    two searches meet after visiting far fewer people than a single BFS.
+
+    If no possible path, returns None.
+    """
+    if graph is not None:
+        return graph.shortest_path(source, target)
+    return bidirectional_search(source, target, neighbors_for_person)
+
+
+def shortest_paths(source, target, limit=MAX_PATHS):
+    """
+    Returns up to limit shortest lists of (movie_id, person_id) pairs
+    that connect the source to the target, from a single search.
+
+    If no possible path, returns [].
+    """
+    if graph is not None:
+        return graph.all_shortest_paths(source, target, limit)
+    return all_shortest_paths(source, target, neighbors_for_person, limit)
+
+
+def newest_paths(source, target, k, limit=MAX_PATHS):
+    """
+    Returns the k shortest paths between source and target whose oldest
+    movie is most recent, out of the first limit shortest paths.
+    """
+    paths = shortest_paths(source, target, limit)
+    return sorted(paths, key=oldest_year, reverse=True)[:k]
+
+
+def oldest_year(path):
+    """
+    Returns the earliest year of the movies on path (0 if unknown).
+    """
+    years = [movie_details(movie_id)[1] for movie_id, person_id in path]
+    return min((int(year) if year.isdigit() else 0 for year in years),
+               default=0)
+
+
+def paths_from(source, targets):
+    """
+    Returns a dict mapping each of targets to its shortest list of
+    (movie_id, person_id) pairs from source, or None if not connected.
+
+    A single BFS from source answers every target, stopping as soon
+    as the last one is reached.
+    """
+    if len(targets) == 1:
+        # A lone target is found faster by searching from both ends
+        target = next(iter(targets))
+        return {target: bidirectional_path(source, target)}
+    if graph is not None:
+        return graph.paths_from(source, targets)
+    return breadth_first_paths(source, targets, neighbors_for_person)
+
+
+def run_batch(lines, output, workers=1):
+    """
+    Answers each "source name<TAB>target name" line in lines, writing
+    one JSON object per line to output in the same order.
+
+    Lines are read BATCH_SIZE at a time and queries sharing a source
+    are answered by one search. With more than one worker, searches
+    run in a process pool forked after loading, so every worker reads
+    the same graph pages instead of loading its own copy.
+    """
+    pool = start_pool(workers)
+    try:
+        batch = []
+        for line in lines:
+            if line.strip():
+                batch.append(line.rstrip("\n"))
+            if len(batch) == BATCH_SIZE:
+                write_results(answer_batch(batch, pool), output)
+                batch = []
+        write_results(answer_batch(batch, pool), output)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+def start_pool(workers):
+    """
+    Returns a pool of forked worker processes, or None to search
+    in this process (one worker, or no fork on this platform).
+    """
+    if workers <= 1:
+        return None
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        return None
+    return context.Pool(workers)
+
+
+def search_all(searches, pool=None):
+    """
+    Returns paths_from(source, targets) for every (source, targets)
+    in searches, in the same order, using pool when given.
+    """
+    if pool is None:
+        return [paths_from(source, targets) for source, targets in searches]
+    # starmap already sends several searches per task to each worker
+    return pool.starmap(paths_from, searches)
+
+
+def write_results(results, output):
+    for result in results:
+        output.write(json.dumps(result) + "\n")
+    output.flush()
+
+
+def answer_batch(batch, pool=None):
+    """
+    Returns one result dict per query line in batch.
+    """
+    results = []
+    queries = {}
+    for line in batch:
+        fields = line.split("\t")
+        if len(fields) != 2:
+            results.append({"query": line, "error": "expected two names"})
+            continue
+        result = {"source": fields[0], "target": fields[1]}
+        results.append(result)
+        source = resolve_name(fields[0], result)
+        target = resolve_name(fields[1], result)
+        if source is not None and target is not None:
+            queries.setdefault(source, []).append((target, result))
+
+    # One search per distinct source
+    searches = [
+        (source, {target for target, result in group})
+        for source, group in queries.items()
+    ]
+    for group, paths in zip(queries.values(), search_all(searches, pool)):
+        for target, result in group:
+            path = paths[target]
+            result["degrees"] = None if path is None else len(path)
+            result["path"] = None if path is None else [
+                describe_step(movie_id, person_id)
+                for movie_id, person_id in path
+            ]
+    return results
+
+
+def resolve_name(name, result):
+    """
+    Returns the only IMDB id for name, or records an error in result.
+    """
+    person_ids = person_ids_for_name(name)
+    if len(person_ids) == 1:
+        return person_ids[0]
+    if "error" not in result:
+        if person_ids:
+            result["error"] = f"ambiguous name: {name}"
+            result["candidates"] = sorted(person_ids)
+        else:
+            result["error"] = f"person not found: {name}"
+            result["suggestions"] = name_suggestions(name)
+    return None
+
+
+def describe_step(movie_id, person_id):
+    return {
+        "movie_id": movie_id,
+        "movie": movie_details(movie_id)[0],
+        "person_id": person_id,
+        "person": person_details(person_id)[0],
+    }
+
+
+def load_landmarks(directory, prune=False):
+    """
+    Loads (building if needed) the landmark index for the compact graph,
+    which was loaded pruned if prune is set.
+    """
+    global landmark_index
+    landmark_index = load_index(directory, graph, prune)
+
+
+def landmark_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, skipping the search
+    whenever landmark distances already settle it.
+
+    If no possible path, returns None.
+    """
+    return landmark_index.shortest_path(source, target)
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
+        suggestions = name_suggestions(name)
+        if suggestions:
+            print(f"No '{name}'. Did you mean:")
+            for suggestion in suggestions:
+                print(f"    {suggestion}")
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            name, birth = person_details(person_id)
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -172,11 +514,54 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def person_ids_for_name(name):
+    """
+    Returns the IMDB ids of every person with the given name.
+    """
+    if graph is not None:
+        return graph.person_ids_for_name(name)
+    return list(names.get(name.lower(), set()))
+
+
+def name_suggestions(name):
+    """
+    Returns known names close to, or starting with, name.
+    """
+    index = graph.name_index() if graph is not None else name_index
+    if index is None:
+        return []
+    # Show each name as written in the data, not lowercased
+    return [person_details(person_ids_for_name(key)[0])[0]
+            for key in index.suggestions(name)]
+
+
+def person_details(person_id):
+    """
+    Returns (name, birth) for a person.
+    """
+    if graph is not None:
+        return graph.person(person_id)
+    person = people[person_id]
+    return person["name"], person["birth"]
+
+
+def movie_details(movie_id):
+    """
+    Returns (title, year) for a movie.
+    """
+    if graph is not None:
+        return graph.movie(movie_id)
+    movie = movies[movie_id]
+    return movie["title"], movie["year"]
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -185,5 +570,14 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Search algorithms selectable from the command line
+SEARCHES = {
+    "bfs": shortest_path,
+    "bidirectional": bidirectional_path,
+    "landmarks": landmark_path,
+    "lean": lean_shortest_path,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,511 @@
+import csv
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+from nameindex import NameIndex
+from util import (all_shortest_paths, bidirectional_search,
+                  breadth_first_paths)
+
+# Bump whenever the snapshot layout or the Graph fields change
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MAGIC = b"DEGREES\0"
+SNAPSHOT_FILE = "graph.snapshot"
+PRUNED_SNAPSHOT_FILE = "graph.pruned.snapshot"
+
+
+class StringTable():
+    """
+    Immutable list of strings packed into one UTF-8 buffer,
+    so millions of names cost one object instead of millions.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = array("q", [0])
+        offsets.extend(accumulate(len(string) for string in encoded))
+        return cls(b"".join(encoded), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+class Graph():
+    """
+    Bipartite person <-> movie graph with people and movies interned to
+    dense integer indices and adjacency stored in compressed sparse rows.
+
+    The movies of person p are person_movies[person_offsets[p]:
+    person_offsets[p + 1]], and the stars of movie m are movie_people[
+    movie_offsets[m]:movie_offsets[m + 1]]. People and movies are sorted
+    by IMDb id, so an id is found by binary search instead of a dict.
+    """
+
+    # Constructor arguments, in order, as stored in snapshots
+    FIELDS = (
+        "person_ids", "person_names", "person_births", "name_order",
+        "movie_ids", "movie_titles", "movie_years",
+        "person_offsets", "person_movies", "movie_offsets", "movie_people",
+    )
+
+    # Fields holding StringTables rather than integer arrays
+    STRINGS = {
+        "person_ids", "person_names", "person_births",
+        "movie_ids", "movie_titles", "movie_years",
+    }
+
+    def __init__(self, person_ids, person_names, person_births, name_order,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.name_order = name_order
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+        self.fuzzy_index = None
+
+    def person_index(self, person_id):
+        """
+        Returns the index of an IMDb person id, or None if unknown.
+        """
+        i = bisect_left(self.person_ids, person_id)
+        if i < len(self.person_ids) and self.person_ids[i] == person_id:
+            return i
+        return None
+
+    def movie_index(self, movie_id):
+        """
+        Returns the index of an IMDb movie id, or None if unknown.
+        """
+        i = bisect_left(self.movie_ids, movie_id)
+        if i < len(self.movie_ids) and self.movie_ids[i] == movie_id:
+            return i
+        return None
+
+    def lower_name(self, person):
+        return self.person_names[person].lower()
+
+    def name_index(self):
+        """
+        Returns the NameIndex over the distinct lowercased person names.
+
+        It is built on first use rather than on load, so loading a
+        snapshot stays fast until a name actually needs looking up.
+        """
+        if self.fuzzy_index is None:
+            self.fuzzy_index = NameIndex(list(dict.fromkeys(
+                self.lower_name(person) for person in self.name_order
+            )))
+        return self.fuzzy_index
+
+    def name_position(self, name):
+        """
+        Returns the first position in name_order whose lowercased name
+        is not before name, by binary search (bisect only takes a key
+        from Python 3.10).
+        """
+        low, high = 0, len(self.name_order)
+        while low < high:
+            middle = (low + high) // 2
+            if self.lower_name(self.name_order[middle]) < name:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def person_ids_for_name(self, name):
+        """
+        Returns the IMDb ids of every person with the given name.
+        """
+        name = name.lower()
+        i = self.name_position(name)
+        person_ids = []
+        while (i < len(self.name_order)
+               and self.lower_name(self.name_order[i]) == name):
+            person_ids.append(self.person_ids[self.name_order[i]])
+            i += 1
+        return person_ids
+
+    def person(self, person_id):
+        """
+        Returns (name, birth) for an IMDb person id.
+        """
+        person = self.person_index(person_id)
+        return self.person_names[person], self.person_births[person]
+
+    def movie(self, movie_id):
+        """
+        Returns (title, year) for an IMDb movie id.
+        """
+        movie = self.movie_index(movie_id)
+        return self.movie_titles[movie], self.movie_years[movie]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        person = self.person_index(person_id)
+        neighbors = set()
+        for i in range(self.person_offsets[person],
+                       self.person_offsets[person + 1]):
+            movie = self.person_movies[i]
+            for j in range(self.movie_offsets[movie],
+                           self.movie_offsets[movie + 1]):
+                neighbors.add((self.movie_ids[movie],
+                               self.person_ids[self.movie_people[j]]))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        Runs the bidirectional BFS over person indices, walking the
+        adjacency arrays directly rather than building neighbor sets.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index(source)
+        target = self.person_index(target)
+        if source is None or target is None:
+            return None
+        path = bidirectional_search(source, target, self.neighbors)
+        return None if path is None else self.path_ids(path)
+
+    def all_shortest_paths(self, source, target, limit):
+        """
+        Returns up to limit shortest lists of (movie_id, person_id) pairs
+        that connect the source to the target, or [] if not connected.
+        """
+        source = self.person_index(source)
+        target = self.person_index(target)
+        if source is None or target is None:
+            return []
+        paths = all_shortest_paths(source, target, self.neighbors, limit)
+        return [self.path_ids(path) for path in paths]
+
+    def paths_from(self, source, targets):
+        """
+        Returns a dict mapping each of targets to its shortest list of
+        (movie_id, person_id) pairs from source, or None if not connected,
+        from a single BFS over person indices.
+        """
+        indices = {target: self.person_index(target) for target in targets}
+        source = self.person_index(source)
+        if source is None:
+            return {target: None for target in targets}
+        paths = breadth_first_paths(
+            source, {i for i in indices.values() if i is not None},
+            self.neighbors
+        )
+        return {target: None if paths.get(i) is None
+                else self.path_ids(paths[i])
+                for target, i in indices.items()}
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person index.
+        """
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def path_ids(self, path):
+        """
+        Returns a path of (movie, person) indices as IMDb ids.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def compressed_rows(rows, columns, size):
+    """
+    Groups parallel arrays of (row, column) edges into compressed sparse
+    rows. Returns (offsets, values) where the columns of row r are
+    values[offsets[r]:offsets[r + 1]].
+    """
+    counts = array("i", bytes(4 * size))
+    for row in rows:
+        counts[row] += 1
+    offsets = array("i", [0])
+    offsets.extend(accumulate(counts))
+
+    # Fill each row from its start, counting sort style
+    position = array("i", offsets[:-1])
+    values = array("i", bytes(4 * len(rows)))
+    for row, column in zip(rows, columns):
+        values[position[row]] = column
+        position[row] += 1
+    return offsets, values
+
+
+def load_graph(directory, cache=True, prune=False):
+    """
+    Load data from CSV files into a compact Graph.
+
+    If cache, reuse the binary snapshot in directory when it matches
+    the current CSV files, and write a fresh one when it does not.
+    If prune, leave out people and movies that cannot be on any path.
+    """
+    if not cache:
+        return parse_graph(directory, prune)
+
+    filename = PRUNED_SNAPSHOT_FILE if prune else SNAPSHOT_FILE
+    path = os.path.join(directory, filename)
+    key = snapshot_key(directory)
+    graph = load_snapshot(path, key)
+    if graph is None:
+        graph = parse_graph(directory, prune)
+        try:
+            save_snapshot(graph, path, key)
+        except OSError:
+            # A read-only dataset just means no cache
+            pass
+    return graph
+
+
+def snapshot_key(directory):
+    """
+    Returns what a snapshot must match to be reused: the size and
+    modification time of every CSV file it was built from.
+    """
+    key = []
+    for filename in ["people.csv", "movies.csv", "stars.csv"]:
+        stat = os.stat(os.path.join(directory, filename))
+        key.append([filename, stat.st_size, stat.st_mtime_ns])
+    return key
+
+
+def save_snapshot(graph, path, key):
+    """
+    Writes graph to path as a header followed by raw array sections.
+
+    Each section is 8-byte aligned so it can be cast straight out of
+    a memory map when loaded.
+    """
+    sections = []
+    for field in Graph.FIELDS:
+        value = getattr(graph, field)
+        if field in Graph.STRINGS:
+            sections.append(array("B", value.data))
+            sections.append(array("q", value.offsets))
+        else:
+            sections.append(array("i", value))
+
+    # Lay out sections after the header
+    layout = []
+    position = 0
+    for section in sections:
+        layout.append([section.typecode, position, len(section)])
+        size = len(section) * section.itemsize
+        position += size + (-size % 8)
+    header = json.dumps({
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "key": key,
+        "sections": layout,
+    }).encode("utf-8")
+    start = len(SNAPSHOT_MAGIC) + 8 + len(header)
+    start += -start % 8
+
+    # Write to a temporary file first so readers never see half a snapshot
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(len(header).to_bytes(8, "little"))
+        f.write(header)
+        for section, (typecode, offset, length) in zip(sections, layout):
+            f.write(bytes(start + offset - f.tell()))
+            f.write(section)
+    os.replace(temporary, path)
+
+
+def load_snapshot(path, key):
+    """
+    Memory-maps the snapshot at path and returns its Graph, or None if
+    there is no snapshot or it is stale, from another version or another
+    byte order, truncated or otherwise corrupt.
+    """
+    try:
+        with open(path, "rb") as f:
+            snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    magic = len(SNAPSHOT_MAGIC)
+    if snapshot[:magic] != SNAPSHOT_MAGIC:
+        return None
+    length = int.from_bytes(snapshot[magic:magic + 8], "little")
+    try:
+        header = json.loads(snapshot[magic + 8:magic + 8 + length])
+    except ValueError:
+        return None
+    if (not isinstance(header, dict)
+            or header.get("version") != SNAPSHOT_VERSION
+            or header.get("byteorder") != sys.byteorder
+            or header.get("key") != key):
+        return None
+    start = magic + 8 + length
+    start += -start % 8
+
+    # Cast every section in place, without copying, after checking it
+    # lies wholly inside the file
+    view = memoryview(snapshot)
+    sections = []
+    try:
+        layout = header["sections"]
+        if len(layout) != len(Graph.FIELDS) + len(Graph.STRINGS):
+            return None
+        for typecode, offset, count in layout:
+            if not (isinstance(offset, int) and isinstance(count, int)
+                    and offset >= 0 and count >= 0):
+                return None
+            size = count * array(typecode).itemsize
+            if start + offset + size > len(snapshot):
+                return None
+            section = view[start + offset:start + offset + size]
+            sections.append(section.cast(typecode))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    # Reassemble string tables from their (data, offsets) pairs
+    values = []
+    sections = iter(sections)
+    for field in Graph.FIELDS:
+        if field in Graph.STRINGS:
+            values.append(StringTable(next(sections), next(sections)))
+        else:
+            values.append(next(sections))
+    return Graph(*values)
+
+
+def bridging_cast(directory):
+    """
+    Streams stars.csv once and returns (person_ids, movie_ids) of the
+    movies with at least two stars and the people who starred in them.
+
+    Everyone else is isolated or only in single-star movies, so no
+    path between two people can pass through them.
+    """
+    first_star = {}
+    person_ids = set()
+    movie_ids = set()
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            person_id, movie_id = row["person_id"], row["movie_id"]
+            if movie_id in movie_ids:
+                person_ids.add(person_id)
+            elif movie_id not in first_star:
+                first_star[movie_id] = person_id
+            elif first_star[movie_id] != person_id:
+                # Second distinct star, so the movie links people
+                movie_ids.add(movie_id)
+                person_ids.add(first_star.pop(movie_id))
+                person_ids.add(person_id)
+    return person_ids, movie_ids
+
+
+def parse_graph(directory, prune=False):
+    """
+    Parse the CSV files in directory into a compact Graph.
+
+    If prune, first stream stars.csv to find which people and movies
+    can link anyone, and keep only those.
+    """
+    if prune:
+        cast, casts = bridging_cast(directory)
+
+    # Load people, sorted by id so ids can be binary searched
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        people = sorted(
+            (row["id"], row["name"], row["birth"])
+            for row in csv.DictReader(f)
+            if not prune or row["id"] in cast
+        )
+    person_ids = [person[0] for person in people]
+    person_names = [person[1] for person in people]
+    person_births = [person[2] for person in people]
+    del people
+
+    # Load movies, sorted the same way
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        movies = sorted(
+            (row["id"], row["title"], row["year"])
+            for row in csv.DictReader(f)
+            if not prune or row["id"] in casts
+        )
+    movie_ids = [movie[0] for movie in movies]
+    movie_titles = [movie[1] for movie in movies]
+    movie_years = [movie[2] for movie in movies]
+    del movies
+
+    # Load stars as parallel arrays of (person, movie) indices
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+    star_people = array("i")
+    star_movies = array("i")
+    seen = set()
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                person = person_index[row["person_id"]]
+                movie = movie_index[row["movie_id"]]
+            except KeyError:
+                continue
+            # Skip duplicate rows, keyed by one int rather than a tuple
+            star = person * len(movie_ids) + movie
+            if star not in seen:
+                seen.add(star)
+                star_people.append(person)
+                star_movies.append(movie)
+    del person_index, movie_index, seen
+    if prune:
+        del cast, casts
+
+    person_offsets, person_movies = compressed_rows(
+        star_people, star_movies, len(person_ids)
+    )
+    movie_offsets, movie_people = compressed_rows(
+        star_movies, star_people, len(movie_ids)
+    )
+
+    # Order people by lowercased name for name lookups
+    name_order = array("i", sorted(
+        range(len(person_names)), key=lambda i: person_names[i].lower()
+    ))
+
+    return Graph(
+        StringTable.from_strings(person_ids),
+        StringTable.from_strings(person_names),
+        StringTable.from_strings(person_births),
+        name_order,
+        StringTable.from_strings(movie_ids),
+        StringTable.from_strings(movie_titles),
+        StringTable.from_strings(movie_years),
+        person_offsets, person_movies, movie_offsets, movie_people,
+    )
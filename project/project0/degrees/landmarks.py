@@ -0,0 +1,303 @@
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+
+from graph import load_graph, snapshot_key
+
+# Bump whenever the index layout changes
+INDEX_VERSION = 1
+INDEX_MAGIC = b"LANDMARK"
+INDEX_FILE = "landmarks.index"
+PRUNED_INDEX_FILE = "landmarks.pruned.index"
+
+# Number of landmarks built by default
+LANDMARKS = 16
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--prune"]
+    prune = len(args) < len(sys.argv) - 1
+    if len(args) not in [1, 2]:
+        sys.exit("Usage: python landmarks.py directory [landmarks] [--prune]")
+    directory = args[0]
+    count = int(args[1]) if len(args) == 2 else LANDMARKS
+
+    print("Loading data...")
+    graph = load_graph(directory, prune=prune)
+    print("Building index...")
+    start = time.perf_counter()
+    index = LandmarkIndex.build(graph, count)
+    path = index_path(directory, prune)
+    index.save(path, snapshot_key(directory))
+    print(f"Built {len(index.landmarks)} landmarks in "
+          f"{time.perf_counter() - start:.2f}s, "
+          f"{os.path.getsize(path) / 2 ** 20:.1f} MiB.")
+
+
+class LandmarkIndex():
+    """
+    Degrees of separation from a few well-connected landmark people to
+    everyone else, one byte per person per landmark.
+
+    By the triangle inequality, for every landmark L the distance between
+    a and b is at least |d(L, a) - d(L, b)| and at most d(L, a) + d(L, b).
+    When the best bounds meet, or a landmark reaches only one of the two,
+    a query is answered without searching at all.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, count=LANDMARKS):
+        """
+        Picks up to count landmarks, most movies first, skipping anyone
+        who shares a movie with a landmark already chosen, and runs a BFS
+        from each.
+        """
+        offsets = graph.person_offsets
+        candidates = sorted(
+            range(len(offsets) - 1),
+            key=lambda person: offsets[person] - offsets[person + 1]
+        )
+        landmarks = array("i")
+        distances = []
+        for person in candidates:
+            if len(landmarks) == count:
+                break
+            if offsets[person] == offsets[person + 1]:
+                # Everyone left has no movies
+                break
+            if any(distance[person] <= 1 for distance in distances):
+                continue
+            landmarks.append(person)
+            distances.append(distances_from(graph, person))
+        return cls(graph, landmarks, distances)
+
+    def save(self, path, key):
+        """
+        Writes the index to path as a header followed by one row of
+        distances per landmark.
+        """
+        header = json.dumps({
+            "version": INDEX_VERSION,
+            "key": key,
+            "people": len(self.graph.person_offsets) - 1,
+            "landmarks": list(self.landmarks),
+        }).encode("utf-8")
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for distance in self.distances:
+                f.write(distance)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, graph, path, key):
+        """
+        Memory-maps the index at path, or returns None if there is none,
+        it was built from other data or it is truncated or corrupt.
+        """
+        try:
+            with open(path, "rb") as f:
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        magic = len(INDEX_MAGIC)
+        if index[:magic] != INDEX_MAGIC:
+            return None
+        length = int.from_bytes(index[magic:magic + 8], "little")
+        try:
+            header = json.loads(index[magic + 8:magic + 8 + length])
+        except ValueError:
+            return None
+        people = len(graph.person_offsets) - 1
+        if (not isinstance(header, dict)
+                or header.get("version") != INDEX_VERSION
+                or header.get("key") != key
+                or header.get("people") != people
+                or not isinstance(header.get("landmarks"), list)):
+            return None
+
+        view = memoryview(index)
+        start = magic + 8 + length
+        if start + len(header["landmarks"]) * people > len(index):
+            return None
+        distances = [
+            view[start + i * people:start + (i + 1) * people]
+            for i in range(len(header["landmarks"]))
+        ]
+        return cls(graph, array("i", header["landmarks"]), distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees between two person
+        indices, or None if a landmark proves they are not connected.
+        """
+        lower = 0
+        upper = None
+        for distance in self.distances:
+            a, b = distance[source], distance[target]
+            if a == UNREACHABLE and b == UNREACHABLE:
+                continue
+            if a == UNREACHABLE or b == UNREACHABLE:
+                return None
+            lower = max(lower, abs(a - b))
+            if upper is None or a + b < upper:
+                upper = a + b
+        return lower, upper
+
+    def degrees(self, source, target):
+        """
+        Returns the degrees of separation between two IMDb person ids,
+        or None if they are not connected, without building the path
+        when the landmark bounds already agree.
+        """
+        graph = self.graph
+        s, t = graph.person_index(source), graph.person_index(target)
+        if s is None or t is None:
+            return None
+        bounds = self.bounds(s, t)
+        if bounds is None:
+            return None
+        if bounds[0] == bounds[1]:
+            return bounds[0]
+        path = graph.shortest_path(source, target)
+        return None if path is None else len(path)
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        When the landmark bounds agree, the path through the landmark
+        that gives the upper bound is shortest, and is read straight off
+        the distance rows. Otherwise falls back to bidirectional BFS.
+
+        If no possible path, returns None.
+        """
+        graph = self.graph
+        s, t = graph.person_index(source), graph.person_index(target)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return []
+        bounds = self.bounds(s, t)
+        if bounds is None:
+            return None
+        if bounds[0] != bounds[1]:
+            return graph.shortest_path(source, target)
+
+        # Route via the landmark that achieves the upper bound
+        for distance in self.distances:
+            if distance[s] + distance[t] == bounds[1]:
+                break
+        path = self.descend(distance, s)
+        ascent = self.descend(distance, t)
+        people = [t] + [person for movie, person in ascent]
+        for i in reversed(range(len(ascent))):
+            path.append((ascent[i][0], people[i]))
+        return [(graph.movie_ids[movie], graph.person_ids[person])
+                for movie, person in path]
+
+    def descend(self, distance, person):
+        """
+        Returns (movie, person) index pairs leading from person down to
+        the landmark of a distance row, one degree at a time.
+        """
+        graph = self.graph
+        person_offsets = graph.person_offsets
+        person_movies = graph.person_movies
+        movie_offsets = graph.movie_offsets
+        movie_people = graph.movie_people
+
+        path = []
+        while distance[person] > 0:
+            closer = distance[person] - 1
+            start, end = person_offsets[person], person_offsets[person + 1]
+            for i in range(start, end):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie],
+                               movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if distance[neighbor] == closer:
+                        break
+                else:
+                    continue
+                break
+            path.append((movie, neighbor))
+            person = neighbor
+        return path
+
+
+def distances_from(graph, landmark):
+    """
+    Returns an array of the degrees from landmark to every person,
+    UNREACHABLE for people in other components.
+    """
+    person_offsets = graph.person_offsets
+    person_movies = graph.person_movies
+    movie_offsets = graph.movie_offsets
+    movie_people = graph.movie_people
+
+    distances = array("B", [UNREACHABLE]) * (len(person_offsets) - 1)
+    distances[landmark] = 0
+    frontier = [landmark]
+    depth = 0
+    while frontier:
+        depth += 1
+        if depth >= UNREACHABLE:
+            raise ValueError("graph too deep for a landmark index")
+        next_frontier = []
+        for person in frontier:
+            start, end = person_offsets[person], person_offsets[person + 1]
+            for i in range(start, end):
+                movie = person_movies[i]
+                for j in range(movie_offsets[movie],
+                               movie_offsets[movie + 1]):
+                    neighbor = movie_people[j]
+                    if distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = depth
+                        next_frontier.append(neighbor)
+        frontier = next_frontier
+    return distances
+
+
+def index_path(directory, prune):
+    """
+    Returns where the landmark index for directory is kept. A pruned
+    graph numbers its people differently, so it has its own index.
+    """
+    return os.path.join(directory, PRUNED_INDEX_FILE if prune else INDEX_FILE)
+
+
+def load_index(directory, graph, prune=False):
+    """
+    Returns the landmark index for directory, building and saving it
+    first if it is missing or stale. If prune, graph was loaded pruned.
+    """
+    path = index_path(directory, prune)
+    key = snapshot_key(directory)
+    index = LandmarkIndex.load(graph, path, key)
+    if index is None:
+        index = LandmarkIndex.build(graph)
+        try:
+            index.save(path, key)
+        except OSError:
+            pass
+    return index
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+from array import array
+from bisect import bisect_left
+
+# Default number of names returned by prefix and fuzzy lookups
+LIMIT = 10
+
+# Largest max_distance a fuzzy lookup can be asked for
+MAX_DISTANCE = 2
+
+# Characters at each end of a name that fuzzy lookups index
+AFFIX = 5
+
+
+class NameIndex():
+    """
+    Prefix and fuzzy lookups over a sorted list of distinct lowercased
+    names.
+
+    Prefix lookups are a binary search, as every name under a prefix
+    sits in one contiguous run of the list.
+
+    Fuzzy lookups use deletion neighbourhoods (as in SymSpell) of the
+    first and of the last AFFIX characters of every name. If two names
+    are within d edits, their first AFFIX characters reach a common
+    string by deleting at most d characters from each, and so do their
+    last AFFIX characters. Only names that pass both tests have their
+    edit distance computed.
+    """
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.heads = Neighbourhood(keys, range(len(keys)))
+        tails = [key[::-1] for key in keys]
+        self.tails = Neighbourhood(
+            tails, array("i", sorted(range(len(keys)), key=tails.__getitem__))
+        )
+        self.heads.partner = self.tails.run_of
+        self.tails.partner = array(
+            "i", map(self.heads.run_of.__getitem__, self.tails.order)
+        )
+
+    def prefix(self, prefix, limit=LIMIT):
+        """
+        Returns up to limit distinct names that start with prefix.
+        """
+        keys = self.keys
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and len(matches) < limit:
+            key = keys[i]
+            if not key.startswith(prefix):
+                break
+            matches.append(key)
+            i += 1
+        return matches
+
+    def fuzzy(self, query, max_distance=2, limit=LIMIT):
+        """
+        Returns up to limit distinct names within max_distance edits
+        (insertions, deletions or substitutions) of query, closest first.
+        """
+        if max_distance > MAX_DISTANCE:
+            raise ValueError(f"max_distance must be at most {MAX_DISTANCE}")
+        keys = self.keys
+        query = query.lower()
+        heads = self.heads.runs_near(query, max_distance)
+        tails = self.tails.runs_near(query[::-1], max_distance)
+
+        # Walk the cheaper side, keeping the names the other side allows
+        if self.heads.cost(heads) <= self.tails.cost(tails):
+            candidates = self.heads.names(heads, self.tails, tails)
+        else:
+            candidates = self.tails.names(tails, self.heads, heads)
+
+        # Each edit adds or removes at most two letters from the set of
+        # letters used, which rules out most candidates cheaply
+        letters = set(query)
+        matches = []
+        for i in candidates:
+            key = keys[i]
+            if (abs(len(key) - len(query)) > max_distance
+                    or len(letters.symmetric_difference(key))
+                    > 2 * max_distance):
+                continue
+            distance = edit_distance(query, key, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, key))
+
+        matches.sort()
+        return [key for distance, key in matches[:limit]]
+
+    def suggestions(self, name, limit=LIMIT):
+        """
+        Returns names the user may have meant: close misspellings first,
+        then names that start with what was typed.
+        """
+        matches = self.fuzzy(name, limit=limit)
+        for key in self.prefix(name, limit):
+            if len(matches) == limit:
+                break
+            if key not in matches:
+                matches.append(key)
+        return matches
+
+
+class Neighbourhood():
+    """
+    Deletion neighbourhood of the first AFFIX characters of strings.
+
+    Taken in sorted order, strings that share their first AFFIX
+    characters form a run; each string left after deleting up to
+    MAX_DISTANCE of those characters maps to the runs it came from.
+    """
+
+    def __init__(self, strings, order):
+        # order[p] is the index of the string at sorted position p, and
+        # run r covers positions starts[r] up to starts[r + 1]
+        self.order = order
+        # Run of the string at each position in the other neighbourhood
+        # of a NameIndex, set once both are built
+        self.partner = None
+        self.starts = array("i")
+        self.run_of = array("i", bytes(4 * len(strings)))
+        self.deletions = {}
+        head = None
+        for position, i in enumerate(order):
+            if strings[i][:AFFIX] != head:
+                head = strings[i][:AFFIX]
+                run = len(self.starts)
+                self.starts.append(position)
+                for variant in deletions(head, MAX_DISTANCE):
+                    self.deletions.setdefault(variant, []).append(run)
+            self.run_of[i] = len(self.starts) - 1
+        self.starts.append(len(strings))
+        self.sizes = array("i", (self.starts[r + 1] - self.starts[r]
+                                 for r in range(len(self.starts) - 1)))
+
+    def runs_near(self, string, distance):
+        """
+        Returns the set of runs whose strings may be within distance
+        edits of string, judging by their first AFFIX characters.
+        """
+        runs = set()
+        for variant in deletions(string[:AFFIX], distance):
+            runs.update(self.deletions.get(variant, ()))
+        return runs
+
+    def cost(self, runs):
+        """
+        Returns a rough cost of walking the strings in runs: a fixed
+        cost per run, plus a much smaller one per string.
+        """
+        return 25 * len(runs) + self.count(runs)
+
+    def count(self, runs):
+        """
+        Returns the number of strings in runs.
+        """
+        return sum(map(self.sizes.__getitem__, runs))
+
+    def names(self, runs, other, other_runs):
+        """
+        Yields the index of every string in runs that is also in one of
+        other_runs of the other neighbourhood.
+
+        One set operation over a run's partner runs finds the few runs
+        it shares strings with, and the strings are then taken from
+        whichever side of that overlap is smaller.
+        """
+        order = self.order
+        starts = self.starts
+        partner = self.partner
+        run_of = self.run_of
+        for run in runs:
+            start, end = starts[run], starts[run + 1]
+            shared = other_runs.intersection(partner[start:end])
+            if not shared:
+                continue
+            if end - start <= other.count(shared):
+                for position in range(start, end):
+                    if partner[position] in shared:
+                        yield order[position]
+                continue
+            for other_run in shared:
+                for position in range(other.starts[other_run],
+                                      other.starts[other_run + 1]):
+                    i = other.order[position]
+                    if run_of[i] == run:
+                        yield i
+
+
+def deletions(word, distance):
+    """
+    Returns the set of strings made by deleting up to distance
+    characters from word, including word itself.
+    """
+    variants = {word}
+    layer = {word}
+    for _ in range(distance):
+        layer = {variant[:i] + variant[i + 1:]
+                 for variant in layer for i in range(len(variant))}
+        variants |= layer
+    return variants
+
+
+def edit_distance(a, b, bound):
+    """
+    Returns the edit distance between a and b, or bound + 1 if it is
+    more than bound.
+    """
+    # Characters shared at either end cost nothing
+    start = 0
+    shortest = min(len(a), len(b))
+    while start < shortest and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < shortest - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a = a[start:len(a) - end]
+    b = b[start:len(b) - end]
+    if not a or not b:
+        return min(len(a) + len(b), bound + 1)
+
+    # The first characters differ, so the first edit substitutes,
+    # deletes or inserts one of them
+    rests = [(a[1:], b[1:]), (a[1:], b), (a, b[1:])]
+    if any(rest_a == rest_b for rest_a, rest_b in rests):
+        return 1
+    if bound <= 1:
+        return bound + 1
+    return min(1 + edit_distance(rest_a, rest_b, bound - 1)
+               for rest_a, rest_b in rests)
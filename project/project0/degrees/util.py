@@ -1,3 +1,6 @@
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +39,250 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class DequeStackFrontier():
+    """
+    Stack frontier backed by a deque, with a count of the states it holds
+    so add, remove and contains_state all run in constant time.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def pop(self):
+        return self.frontier.pop()
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        node = self.pop()
+        # The same state may be queued more than once
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+        return node
+
+
+class DequeQueueFrontier(DequeStackFrontier):
+
+    def pop(self):
+        return self.frontier.popleft()
+
+
+def all_shortest_paths(source, target, neighbors, limit):
+    """
+    Returns up to limit shortest paths from source to target, each a list
+    of (action, state) pairs like shortest_path, or [] if not connected.
+
+    neighbors(state) gives the (action, state) pairs one step away.
+    One bidirectional BFS labels states with their depth from each end
+    and keeps every parent one layer closer, so all shortest paths are
+    read off the two parent lists instead of searching again.
+    """
+    if source == target:
+        return [[]]
+
+    depths = [{source: 0}, {target: 0}]
+    parents = [{source: []}, {target: []}]
+    frontiers = [[source], [target]]
+    while frontiers[0] and frontiers[1]:
+        # Always grow the cheaper side
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        depth, parent, other = depths[side], parents[side], depths[1 - side]
+
+        next_frontier = []
+        meetings = []
+        for state in frontiers[side]:
+            level = depth[state] + 1
+            for action, neighbor in neighbors(state):
+                if neighbor not in depth:
+                    depth[neighbor] = level
+                    parent[neighbor] = []
+                    next_frontier.append(neighbor)
+                    if neighbor in other:
+                        meetings.append(neighbor)
+                if depth[neighbor] == level:
+                    parent[neighbor].append((state, action))
+        frontiers[side] = next_frontier
+
+        if meetings:
+            # Shortest paths cross this layer where the other side is nearest
+            nearest = min(other[state] for state in meetings)
+            meetings = [state for state in meetings if other[state] == nearest]
+            return join_walks(meetings, parents, limit)
+
+    # One side ran out of states, so no connection
+    return []
+
+
+def join_walks(meetings, parents, limit):
+    """
+    Returns up to limit paths made of every walk from source to a meeting
+    state followed by every walk from it to target.
+    """
+    paths = []
+    for meeting in meetings:
+        for forward in walks(meeting, parents[0]):
+            # Walk is meeting -> source; turn it into source -> meeting
+            states = [meeting] + [state for action, state in forward]
+            head = [(forward[i][0], states[i])
+                    for i in reversed(range(len(forward)))]
+            for backward in walks(meeting, parents[1]):
+                paths.append(head + backward)
+                if len(paths) == limit:
+                    return paths
+    return paths
+
+
+def walks(state, parents):
+    """
+    Yields every walk from state back to the root of parents, as lists
+    of (action, next state) pairs.
+    """
+    if not parents[state]:
+        yield []
+        return
+    for previous, action in parents[state]:
+        for walk in walks(previous, parents):
+            yield [(action, previous)] + walk
+
+
+def bidirectional_search(source, target, neighbors):
+    """
+    Returns the shortest list of (action, state) pairs that connect
+    source to target, searching from both ends, or None if not connected.
+
+    neighbors(state) gives the (action, state) pairs one step away.
+    Each step expands one whole layer of the smaller frontier, so the
+    two searches meet after visiting far fewer states than a single BFS.
+    """
+    if source == target:
+        return []
+
+    # Parents map a state to (previous state, action) on its side
+    forward_parents = {source: None}
+    backward_parents = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        # Always grow the cheaper side
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward_parents, backward_parents,
+                neighbors
+            )
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward_parents, forward_parents,
+                neighbors
+            )
+        if meeting is not None:
+            return join_paths(meeting, forward_parents, backward_parents)
+
+    # One side ran out of states, so no connection
+    return None
+
+
+def expand_layer(frontier, parents, other_parents, neighbors):
+    """
+    Expands every state in frontier by one step, recording parents.
+
+    Returns the next frontier and the meeting state closest to the
+    other side (or None if the two searches have not met yet).
+    """
+    next_frontier = []
+    meeting = None
+    best = None
+    for state in frontier:
+        for action, neighbor in neighbors(state):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (state, action)
+            next_frontier.append(neighbor)
+            if neighbor in other_parents:
+                # Keep the meeting point with the shortest remaining half
+                distance = path_length(neighbor, other_parents)
+                if best is None or distance < best:
+                    meeting, best = neighbor, distance
+    return next_frontier, meeting
+
+
+def path_length(state, parents):
+    """
+    Returns the number of steps from state back to the root of parents.
+    """
+    length = 0
+    while parents[state] is not None:
+        state = parents[state][0]
+        length += 1
+    return length
+
+
+def join_paths(meeting, forward_parents, backward_parents):
+    """
+    Builds the (action, state) path through the meeting state.
+    """
+    # Walk back from meeting to source
+    path = path_to(meeting, forward_parents)
+
+    # Walk forward from meeting to target
+    state = meeting
+    while backward_parents[state] is not None:
+        following, action = backward_parents[state]
+        path.append((action, following))
+        state = following
+    return path
+
+
+def breadth_first_paths(source, targets, neighbors):
+    """
+    Returns a dict mapping each of targets to its shortest list of
+    (action, state) pairs from source, or None if not connected.
+
+    A single BFS from source answers every target, stopping as soon
+    as the last one is reached.
+    """
+    remaining = set(targets)
+    parents = {source: None}
+    frontier = [source]
+    remaining.discard(source)
+    while frontier and remaining:
+        next_frontier = []
+        for state in frontier:
+            for action, neighbor in neighbors(state):
+                if neighbor not in parents:
+                    parents[neighbor] = (state, action)
+                    next_frontier.append(neighbor)
+                    remaining.discard(neighbor)
+        frontier = next_frontier
+
+    return {target: path_to(target, parents) if target in parents else None
+            for target in targets}
+
+
+def path_to(state, parents):
+    """
+    Builds the (action, state) path from the root of parents to state.
+    """
+    path = []
+    while parents[state] is not None:
+        previous, action = parents[state]
+        path.append((action, state))
+        state = previous
+    path.reverse()
+    return path
@@ -0,0 +1,182 @@
+"""
+Tic Tac Toe Arena
+
+Plays many headless games between two agents, in parallel, and reports
+how fast they play and how the games end.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+# Seconds the m,n,k engine may spend on each move in the arena
+MNK_DEADLINE = 0.05
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play tic-tac-toe agents against each other."
+    )
+    parser.add_argument("first", choices=AGENTS)
+    parser.add_argument("second", choices=AGENTS)
+    parser.add_argument("games", nargs="?", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="processes playing games at once")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the random agent")
+    args = parser.parse_args()
+    if "book" in [args.first, args.second] and ttt.book is None:
+        sys.exit("No opening book: run python book.py first.")
+
+    start = time.perf_counter()
+    results = play_all(args.first, args.second, args.games, args.workers,
+                       args.seed)
+    seconds = time.perf_counter() - start
+    print(f"{args.games} games in {seconds:.2f}s, "
+          f"{args.games / seconds:.1f} games/s "
+          f"({max(args.workers, 1)} workers)")
+    print_stats(summarize(results, [args.first, args.second]))
+
+
+def random_agent(board, rng):
+    """
+    Plays any legal move.
+    """
+    return rng.choice(sorted(ttt.actions(board)))
+
+
+def minimax_agent(board, rng):
+    """
+    Plays alpha-beta with the process-wide transposition table.
+    """
+    return ttt.best_action(board)[1]
+
+
+def alphabeta_agent(board, rng):
+    """
+    Plays alpha-beta without a transposition table.
+    """
+    return ttt.best_action(board, None)[1]
+
+
+def bitboard_agent(board, rng):
+    """
+    Plays alpha-beta on bitboards.
+    """
+    return bitboard.minimax(board)
+
+
+def book_agent(board, rng):
+    """
+    Plays moves looked up in the opening book.
+    """
+    return ttt.minimax(board)
+
+
+# One game object per process, as it is cheap to keep and slow to build
+mnk_game = mnk.MNKGame()
+
+
+def mnk_agent(board, rng):
+    """
+    Plays the m,n,k engine's iterative deepening on the 3x3 board.
+    """
+    return mnk_game.minimax(board, deadline=MNK_DEADLINE)
+
+
+# Name -> (agent, module whose nodes_searched counts its work)
+AGENTS = {
+    "random": (random_agent, None),
+    "minimax": (minimax_agent, ttt),
+    "alphabeta": (alphabeta_agent, ttt),
+    "bitboard": (bitboard_agent, bitboard),
+    "book": (book_agent, ttt),
+    "mnk": (mnk_agent, mnk_game),
+}
+
+
+def play_all(first, second, games, workers, seed=0):
+    """
+    Returns the results of games between agents first and second, which
+    swap sides every game, played by a pool of worker processes.
+    """
+    tasks = [(first, second, seed + game) if game % 2 == 0
+             else (second, first, seed + game)
+             for game in range(games)]
+    if workers <= 1:
+        return [play_game(*task) for task in tasks]
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        return [play_game(*task) for task in tasks]
+    with context.Pool(workers) as pool:
+        return pool.starmap(play_game, tasks,
+                            chunksize=max(1, games // (4 * workers)))
+
+
+def play_game(x, o, seed):
+    """
+    Plays one game with agent x as X and agent o as O, and returns
+    (x, o, winner, stats) where stats maps each side to its number of
+    moves, nodes searched and seconds spent.
+    """
+    rng = random.Random(seed)
+    board = ttt.initial_state()
+    stats = {ttt.X: [0, 0, 0.0], ttt.O: [0, 0, 0.0]}
+    while not ttt.terminal(board):
+        side = ttt.player(board)
+        agent, counter = AGENTS[x if side == ttt.X else o]
+        if counter is not None:
+            counter.nodes_searched = 0
+        start = time.perf_counter()
+        action = agent(board, rng)
+        stats[side][2] += time.perf_counter() - start
+        stats[side][0] += 1
+        if counter is not None:
+            stats[side][1] += counter.nodes_searched
+        board = ttt.result(board, action)
+    return x, o, ttt.winner(board), stats
+
+
+def summarize(results, names):
+    """
+    Returns per-agent totals over the results: wins, losses, draws,
+    moves, nodes and seconds. An agent playing itself is counted once
+    per side.
+    """
+    totals = {name: [0, 0, 0, 0, 0, 0.0] for name in names}
+    for x, o, winner, stats in results:
+        for name, side in [(x, ttt.X), (o, ttt.O)]:
+            total = totals[name]
+            if winner is None:
+                total[2] += 1
+            elif winner == side:
+                total[0] += 1
+            else:
+                total[1] += 1
+            moves, nodes, seconds = stats[side]
+            total[3] += moves
+            total[4] += nodes
+            total[5] += seconds
+    return totals
+
+
+def print_stats(totals):
+    print(f"{'agent':>10} {'wins':>7} {'losses':>7} {'draws':>7} "
+          f"{'nodes/move':>11} {'ms/move':>9}")
+    for name, (wins, losses, draws, moves, nodes, seconds) in \
+            totals.items():
+        moves = max(moves, 1)
+        print(f"{name:>10} {wins:>7} {losses:>7} {draws:>7} "
+              f"{nodes / moves:>11.1f} {1000 * seconds / moves:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import sys
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in BENCHMARKS:
+        choices = "|".join(BENCHMARKS)
+        sys.exit(f"Usage: python benchmark.py [{choices}]")
+    BENCHMARKS[sys.argv[1]]()
+
+
+def measure(search, board, backend=ttt):
+    """
+    Runs search(board) and returns (result, nodes searched, seconds).
+    """
+    backend.nodes_searched = 0
+    start = time.perf_counter()
+    result = search(board)
+    return result, backend.nodes_searched, time.perf_counter() - start
+
+
+def benchmark_alphabeta():
+    """
+    Compares exhaustive minimax with alpha-beta from the empty board.
+    """
+    board = ttt.initial_state()
+    searches = [
+        ("exhaustive", ttt.exhaustive_minimax),
+        ("alpha-beta", lambda board: ttt.best_action(board, None)[1]),
+    ]
+    for name, search in searches:
+        action, nodes, seconds = measure(search, board)
+        print(f"{name:>12}: {nodes:>9} nodes, {seconds:8.3f}s, "
+              f"move {action}")
+
+
+def benchmark_table():
+    """
+    Compares alpha-beta without and with the transposition table, and
+    a second call once the table is warm. Searches best_action
+    directly, as minimax answers from the opening book when there is one.
+    """
+    board = ttt.initial_state()
+    ttt.transposition_table.clear()
+    searches = [
+        ("no table", lambda board: ttt.best_action(board, None)[1]),
+        ("cold table", lambda board: ttt.best_action(board)[1]),
+        ("warm table", lambda board: ttt.best_action(board)[1]),
+    ]
+    for name, search in searches:
+        action, nodes, seconds = measure(search, board)
+        print(f"{name:>12}: {nodes:>9} nodes, {1000 * seconds:8.3f}ms, "
+              f"move {action}")
+    print(f"{len(ttt.transposition_table)} positions in the table.")
+
+
+def benchmark_bitboard():
+    """
+    Compares the list and bitboard backends solving the full game tree
+    from the empty board, with and without pruning.
+    """
+    searches = [
+        ("lists", "exhaustive", ttt, ttt.exhaustive_minimax),
+        ("bitboard", "exhaustive", bitboard, bitboard.exhaustive_minimax),
+        ("lists", "alpha-beta", ttt,
+         lambda board: ttt.best_action(board, None)[1]),
+        ("bitboard", "alpha-beta", bitboard,
+         lambda board: bitboard.best_action(board)[1]),
+    ]
+    for name, search_name, backend, search in searches:
+        board = backend.initial_state()
+        action, nodes, seconds = measure(search, board, backend)
+        print(f"{name:>9} {search_name:>10}: {nodes:>9} nodes, "
+              f"{seconds:8.3f}s, {nodes / seconds:>10.0f} nodes/s, "
+              f"move {action}")
+
+
+def benchmark_book():
+    """
+    Compares the time to pick a move by search and from the opening
+    book, over every position where the AI can move.
+    """
+    if ttt.book is None:
+        sys.exit("No opening book: run python book.py first.")
+    boards = []
+    frontier = [ttt.initial_state()]
+    seen = set()
+    while frontier:
+        board = frontier.pop()
+        code = ttt.board_code(board)
+        if code in seen or ttt.terminal(board):
+            continue
+        seen.add(code)
+        boards.append(board)
+        frontier.extend(ttt.result(board, action)
+                        for action in ttt.actions(board))
+
+    searches = [
+        ("search", lambda board: ttt.best_action(board, None)[1]),
+        ("book", ttt.minimax),
+    ]
+    for name, search in searches:
+        slowest = 0
+        start = time.perf_counter()
+        for board in boards:
+            _, _, seconds = measure(search, board)
+            slowest = max(slowest, seconds)
+        total = time.perf_counter() - start
+        print(f"{name:>8}: {1e6 * total / len(boards):9.1f}us per move, "
+              f"slowest {1000 * slowest:8.3f}ms, {len(boards)} positions")
+
+
+def benchmark_mnk():
+    """
+    Shows how deep the m,n,k engine searches the empty board of larger
+    games within the default time budget.
+    """
+    for m, n, k in [(3, 3, 3), (4, 4, 4), (5, 5, 4), (7, 7, 5)]:
+        game = mnk.MNKGame(m, n, k)
+        start = time.perf_counter()
+        action = game.minimax(game.initial_state())
+        seconds = time.perf_counter() - start
+        print(f"{m}x{n}, {k} in a row: depth {game.depth_reached:>2}, "
+              f"{game.nodes_searched:>7} nodes, {seconds:6.3f}s, "
+              f"move {action}")
+
+
+BENCHMARKS = {
+    "alphabeta": benchmark_alphabeta,
+    "table": benchmark_table,
+    "bitboard": benchmark_bitboard,
+    "book": benchmark_book,
+    "mnk": benchmark_mnk,
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Tic Tac Toe Player on bitboards
+
+A board is a pair (x, o) of 9-bit integers, one bit per cell, where
+cell (i, j) is bit 3 * i + j. Moves and win checks are a handful of
+integer operations instead of walks over nested lists.
+"""
+
+import math
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+
+# Every cell set
+FULL = 0b111111111
+
+# Rows, columns and diagonals as masks of the cells they cover
+WINS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# Number of cells set in each 9-bit mask (int.bit_count needs 3.10)
+COUNTS = [bin(mask).count("1") for mask in range(FULL + 1)]
+
+# Same center/corner-first order as tictactoe.py, as bit positions
+MOVE_ORDER = [3 * i + j for i, j in ttt.MOVE_ORDER]
+
+# Boards visited by the search functions, for benchmarking
+nodes_searched = 0
+
+
+def from_board(board):
+    """
+    Returns the bitboard for a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(board):
+    """
+    Returns the list-of-lists board for a bitboard.
+    """
+    x, o = board
+    cells = []
+    for i in range(3):
+        row = []
+        for j in range(3):
+            bit = 1 << (3 * i + j)
+            row.append(X if x & bit else O if o & bit else ttt.EMPTY)
+        cells.append(row)
+    return cells
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return 0, 0
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = board
+    return O if COUNTS[x] > COUNTS[o] else X
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    empty = FULL & ~(board[0] | board[1])
+    return {divmod(cell, 3) for cell in range(9) if empty >> cell & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = board
+    bit = 1 << (3 * action[0] + action[1])
+    if (x | o) & bit:
+        raise ValueError("Invalid Action")
+    if COUNTS[x] > COUNTS[o]:
+        return x, o | bit
+    return x | bit, o
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = board
+    for mask in WINS:
+        if x & mask == mask:
+            return X
+        if o & mask == mask:
+            return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return (board[0] | board[1]) == FULL or winner(board) is not None
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    return {X: 1, O: -1, None: 0}[winner(board)]
+
+
+def max_value(board):
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+    v = -math.inf
+    for action in actions(board):
+        v = max(v, min_value(result(board, action)))
+    return v
+
+
+def min_value(board):
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+    v = math.inf
+    for action in actions(board):
+        v = min(v, max_value(result(board, action)))
+    return v
+
+
+def alphabeta(x, o, alpha, beta):
+    """
+    Returns the minimax value of the board (x, o), searching only as
+    far as needed to tell whether it lies between alpha and beta.
+
+    Works on the raw integers so each move is a single bitwise or.
+    """
+    global nodes_searched
+    nodes_searched += 1
+    for mask in WINS:
+        if x & mask == mask:
+            return 1
+        if o & mask == mask:
+            return -1
+    taken = x | o
+    if taken == FULL:
+        return 0
+
+    if COUNTS[x] == COUNTS[o]:
+        v = -math.inf
+        for cell in MOVE_ORDER:
+            bit = 1 << cell
+            if taken & bit:
+                continue
+            v = max(v, alphabeta(x | bit, o, alpha, beta))
+            alpha = max(alpha, v)
+            if alpha >= beta:
+                break
+    else:
+        v = math.inf
+        for cell in MOVE_ORDER:
+            bit = 1 << cell
+            if taken & bit:
+                continue
+            v = min(v, alphabeta(x, o | bit, alpha, beta))
+            beta = min(beta, v)
+            if alpha >= beta:
+                break
+    return v
+
+
+def best_action(board):
+    """
+    Returns (value, action) for the player to move, in a single
+    alpha-beta pass over the board's children.
+    """
+    x, o = board
+    taken = x | o
+    maximizing = player(board) == X
+    alpha, beta = -math.inf, math.inf
+    best = None
+    for cell in MOVE_ORDER:
+        bit = 1 << cell
+        if taken & bit:
+            continue
+        if maximizing:
+            v = alphabeta(x | bit, o, alpha, beta)
+            if v > alpha:
+                alpha, best = v, divmod(cell, 3)
+            if v == 1:
+                break
+        else:
+            v = alphabeta(x, o | bit, alpha, beta)
+            if v < beta:
+                beta, best = v, divmod(cell, 3)
+            if v == -1:
+                break
+    return (alpha if maximizing else beta), best
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+
+    Accepts a bitboard or, as runner.py passes, a list-of-lists board.
+    """
+    if isinstance(board, list):
+        board = from_board(board)
+    if terminal(board):
+        return None
+    return best_action(board)[1]
+
+
+def exhaustive_minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    using the full minimax search without pruning.
+    """
+    if player(board) == X:
+        value = max_value(board)
+        for action in actions(board):
+            if value == min_value(result(board, action)):
+                return action
+    else:
+        value = min_value(board)
+        for action in actions(board):
+            if value == max_value(result(board, action)):
+                return action
@@ -0,0 +1,101 @@
+"""
+Writes the opening book used by tictactoe.minimax
+
+Solves every position reachable from the empty board and stores its
+value and optimal moves, so the AI can move by a table lookup.
+"""
+
+import os
+import sys
+import time
+from array import array
+
+import bitboard
+import tictactoe as ttt
+
+# Weight of each cell's digit in tictactoe.board_code
+WEIGHTS = [3 ** (8 - cell) for cell in range(9)]
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python book.py [output]")
+    path = sys.argv[1] if len(sys.argv) == 2 else ttt.BOOK_FILE
+
+    start = time.perf_counter()
+    values = {}
+    solve(0, 0, values)
+    entries = build_book(values)
+    write_book(entries, path)
+    positions = sum(1 for entry in entries if entry)
+    print(f"Solved {len(values)} positions in "
+          f"{time.perf_counter() - start:.2f}s; wrote {positions} "
+          f"entries, {os.path.getsize(path)} bytes, to {path}.")
+
+
+def solve(x, o, values):
+    """
+    Returns the minimax value of the bitboard (x, o), recording the
+    value of every position below it in values.
+    """
+    if (x, o) in values:
+        return values[(x, o)]
+    v = bitboard.utility((x, o))
+    if not bitboard.terminal((x, o)):
+        taken = x | o
+        x_to_move = bitboard.COUNTS[x] == bitboard.COUNTS[o]
+        children = []
+        for cell in range(9):
+            bit = 1 << cell
+            if taken & bit:
+                continue
+            if x_to_move:
+                children.append(solve(x | bit, o, values))
+            else:
+                children.append(solve(x, o | bit, values))
+        v = max(children) if x_to_move else min(children)
+    values[(x, o)] = v
+    return v
+
+
+def build_book(values):
+    """
+    Returns the book entries for the solved positions, laid out as
+    described in tictactoe.load_book.
+    """
+    entries = array("H", [0]) * ttt.BOOK_SIZE
+    for (x, o), v in values.items():
+        if bitboard.terminal((x, o)):
+            continue
+        taken = x | o
+        x_to_move = bitboard.COUNTS[x] == bitboard.COUNTS[o]
+        mask = 0
+        for cell in range(9):
+            bit = 1 << cell
+            if taken & bit:
+                continue
+            if x_to_move:
+                child = (x | bit, o)
+            else:
+                child = (x, o | bit)
+            if values[child] == v:
+                mask |= bit
+        code = sum(WEIGHTS[cell] * (1 if x >> cell & 1 else 2)
+                   for cell in range(9) if taken >> cell & 1)
+        entries[code] = (v + 2) << 9 | mask
+    return entries
+
+
+def write_book(entries, path):
+    """
+    Writes the book entries to path, replacing any older book at once.
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(ttt.BOOK_MAGIC)
+        f.write(entries.tobytes())
+    os.replace(temporary, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+m,n,k Player
+
+Tic-tac-toe generalized to an m-row by n-column board where k in a row
+wins. Boards too big to solve are searched by iterative deepening within
+a time budget, scoring unfinished positions with a heuristic.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 10 ** 9
+
+# Seconds allowed for one move unless told otherwise
+DEADLINE = 1.0
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time for a move has run out.
+    """
+
+
+class MNKGame():
+    """
+    The tic-tac-toe API of tictactoe.py for any m, n and k, with a
+    depth-limited search for choosing moves.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError("k must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every run of k cells a player could fill to win
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.lines.append(
+                            [(i + di * s, j + dj * s) for s in range(k)]
+                        )
+
+        # Cells closest to the center first, as they take part in the
+        # most lines
+        self.cells = sorted(
+            ((i, j) for i in range(m) for j in range(n)),
+            key=lambda cell: (abs(2 * cell[0] - (m - 1))
+                              + abs(2 * cell[1] - (n - 1)))
+        )
+
+        # Statistics of the last call to minimax, for benchmarking
+        self.nodes_searched = 0
+        self.depth_reached = 0
+        self.stop = math.inf
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x = sum(row.count(X) for row in board)
+        o = sum(row.count(O) for row in board)
+        return O if x > o else X
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return set(self.ordered_actions(board))
+
+    def ordered_actions(self, board):
+        """
+        Returns all possible actions on the board, central cells first.
+        """
+        return [(i, j) for i, j in self.cells if board[i][j] == EMPTY]
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] is not EMPTY:
+            raise ValueError("Invalid Action")
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for line in self.lines:
+            i, j = line[0]
+            first = board[i][j]
+            if first is not EMPTY and all(
+                board[i][j] == first for i, j in line
+            ):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        if self.winner(board) is not None:
+            return True
+        return all(EMPTY not in row for row in board)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        return {X: 1, O: -1, None: 0}[self.winner(board)]
+
+    def evaluate(self, board):
+        """
+        Returns a heuristic score of the board from X's point of view.
+
+        Every line still open to only one player is worth more the more
+        of its cells that player holds; lines both players have entered
+        can no longer be won and count for nothing.
+        """
+        score = 0
+        for line in self.lines:
+            x = o = 0
+            for i, j in line:
+                cell = board[i][j]
+                if cell == X:
+                    x += 1
+                elif cell == O:
+                    o += 1
+            if o == 0 and x > 0:
+                score += 10 ** x
+            elif x == 0 and o > 0:
+                score -= 10 ** o
+        return score
+
+    def minimax(self, board, deadline=DEADLINE, max_depth=None):
+        """
+        Returns the best action found for the current player on the board
+        within deadline seconds, searching one ply deeper at a time.
+
+        The move from the deepest search that finished is returned, so a
+        move always comes back even if the first search is cut short.
+        """
+        if self.terminal(board):
+            return None
+        moves = self.ordered_actions(board)
+        if max_depth is None:
+            max_depth = len(moves)
+        self.stop = time.perf_counter() + deadline
+        self.nodes_searched = 0
+        self.depth_reached = 0
+
+        best = moves[0]
+        maximizing = self.player(board) == X
+        for depth in range(1, max_depth + 1):
+            try:
+                scores = {}
+                alpha, beta = -math.inf, math.inf
+                for action in moves:
+                    v = self.alphabeta(self.result(board, action),
+                                       depth - 1, alpha, beta)
+                    scores[action] = v
+                    if maximizing:
+                        alpha = max(alpha, v)
+                    else:
+                        beta = min(beta, v)
+            except SearchTimeout:
+                break
+
+            # Search the best moves first next time round
+            moves.sort(key=lambda action: scores[action],
+                       reverse=maximizing)
+            best = moves[0]
+            self.depth_reached = depth
+            # A forced result will not change with more depth
+            if abs(scores[best]) > WIN // 2:
+                break
+        return best
+
+    def alphabeta(self, board, depth, alpha, beta):
+        """
+        Returns the value of the board searched depth plies ahead, with
+        the heuristic standing in for the positions left unsearched.
+        """
+        self.nodes_searched += 1
+        if time.perf_counter() > self.stop:
+            raise SearchTimeout
+
+        winner = self.winner(board)
+        if winner is not None:
+            # Prefer quick wins and slow losses
+            won = WIN + depth
+            return won if winner == X else -won
+        moves = self.ordered_actions(board)
+        if not moves:
+            return 0
+        if depth == 0:
+            return self.evaluate(board)
+
+        if self.player(board) == X:
+            v = -math.inf
+            for action in moves:
+                v = max(v, self.alphabeta(self.result(board, action),
+                                          depth - 1, alpha, beta))
+                alpha = max(alpha, v)
+                if alpha >= beta:
+                    break
+        else:
+            v = math.inf
+            for action in moves:
+                v = min(v, self.alphabeta(self.result(board, action),
+                                          depth - 1, alpha, beta))
+                beta = min(beta, v)
+                if alpha >= beta:
+                    break
+        return v
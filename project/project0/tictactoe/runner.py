@@ -1,9 +1,39 @@
+import multiprocessing
 import pygame
 import sys
 import time
+from multiprocessing.pool import ThreadPool
 
 import tictactoe as ttt
 
+
+def start_worker():
+    """
+    Returns a pool of two workers for AI searches: forked processes
+    where possible, or else threads. While one finishes a cancelled
+    search, the other is free for the next one.
+    """
+    try:
+        return multiprocessing.get_context("fork").Pool(2)
+    except ValueError:
+        return ThreadPool(2)
+
+
+def cancel_search():
+    """
+    Drops the AI search in progress. Its worker finishes the search and
+    the result is ignored, as a worker forked now to replace it would
+    inherit pygame's window.
+    """
+    global search
+    search = None
+
+
+# Searches run off the render loop, so frames keep coming while the AI
+# thinks; start the worker before pygame so it does not inherit a window
+worker = start_worker()
+search = None
+
 pygame.init()
 size = width, height = 600, 400
 
@@ -19,12 +49,21 @@ moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+
+# Frame times while the AI is thinking, in milliseconds
+clock = pygame.time.Clock()
+fps = 60
+ai_frames = []
 
 while True:
+    frame_time = clock.tick(fps)
+    if search is not None:
+        ai_frames.append(frame_time)
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel_search()
+            worker.terminate()
             sys.exit()
 
     screen.fill(black)
@@ -110,13 +149,17 @@ while True:
 
         # Check for AI move
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
+            if search is None:
+                search = worker.apply_async(ttt.minimax, (board,))
+                ai_frames = []
+            elif search.ready():
+                move = search.get()
+                search = None
                 board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+                if ai_frames:
+                    print(f"AI move: {len(ai_frames)} frames, "
+                          f"mean {sum(ai_frames) / len(ai_frames):.1f}ms, "
+                          f"max {max(ai_frames)}ms")
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -127,20 +170,21 @@ while True:
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+        # Offer a new game at any time, which cancels the AI's search
+        # if it is thinking
+        againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
+        again = mediumFont.render("Play Again", True, black)
+        againRect = again.get_rect()
+        againRect.center = againButton.center
+        pygame.draw.rect(screen, white, againButton)
+        screen.blit(again, againRect)
+        click, _, _ = pygame.mouse.get_pressed()
+        if click == 1:
+            mouse = pygame.mouse.get_pos()
+            if againButton.collidepoint(mouse):
+                time.sleep(0.2)
+                cancel_search()
+                user = None
+                board = ttt.initial_state()
 
     pygame.display.flip()
@@ -3,12 +3,62 @@ Tic Tac Toe Player
 """
 
 import math
+import os
+from array import array
 from copy import deepcopy
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Center first, then corners, then edges: the moves most likely to be
+# best, so alpha-beta finds good bounds early and prunes more
+MOVE_ORDER = [(1, 1), (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Boards visited by the search functions, for benchmarking
+nodes_searched = 0
+
+
+def symmetries():
+    """
+    Returns the cells of the board in reading order under each of its
+    8 rotations and reflections.
+    """
+    transforms = []
+    for turns in range(4):
+        for mirror in [False, True]:
+            cells = []
+            for i in range(3):
+                for j in range(3):
+                    row, column = i, j
+                    for _ in range(turns):
+                        row, column = column, 2 - row
+                    if mirror:
+                        column = 2 - column
+                    cells.append((row, column))
+            transforms.append(cells)
+    return transforms
+
+
+# Reading order of the cells under every symmetry of the board
+SYMMETRIES = symmetries()
+
+# Kinds of values stored in the transposition table: the exact value,
+# or only a bound when alpha-beta cut the search short
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+
+# Canonical board -> (value, kind), shared by every search in the process
+transposition_table = {}
+
+# Opening book written by book.py: one entry per base-3 board code
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "book.bin")
+BOOK_MAGIC = b"TTTBOOK\0"
+BOOK_SIZE = 3 ** 9
+
 
 def initial_state():
     """
@@ -155,6 +205,8 @@ def utility(board):
     
 
 def max_value(board):
+    global nodes_searched
+    nodes_searched += 1
     # Is game over?
     if terminal(board):
         return utility(board)
@@ -167,6 +219,8 @@ def max_value(board):
     return v
 
 def min_value(board):
+    global nodes_searched
+    nodes_searched += 1
     # Is game over?
     if terminal(board):
         return utility(board)
@@ -178,9 +232,171 @@ def min_value(board):
         v = min(v, max_value(result(board, action)))
     return v
 
+def ordered_actions(board):
+    """
+    Returns all possible actions on the board, most promising first.
+    """
+    return [action for action in MOVE_ORDER
+            if board[action[0]][action[1]] == EMPTY]
+
+
+def canonical(board):
+    """
+    Returns one string shared by the board and all its rotations and
+    reflections, which have the same minimax value.
+    """
+    return min("".join(board[i][j] or "-" for i, j in cells)
+               for cells in SYMMETRIES)
+
+
+def alphabeta(board, alpha, beta, table=None):
+    """
+    Returns the minimax value of the board, searching only as far as
+    needed to tell whether it lies between alpha and beta.
+
+    If table is given, it caches results by canonical board, so each
+    distinct position is searched at most once per window.
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if terminal(board):
+        return utility(board)
+
+    if table is not None:
+        key = canonical(board)
+        if key in table:
+            v, kind = table[key]
+            if kind == EXACT:
+                return v
+            elif kind == LOWER:
+                alpha = max(alpha, v)
+            else:
+                beta = min(beta, v)
+            if alpha >= beta:
+                return v
+        window = (alpha, beta)
+
+    if player(board) == X:
+        v = -math.inf
+        for action in ordered_actions(board):
+            v = max(v, alphabeta(result(board, action), alpha, beta, table))
+            alpha = max(alpha, v)
+            # Min player already has a better option elsewhere
+            if alpha >= beta:
+                break
+    else:
+        v = math.inf
+        for action in ordered_actions(board):
+            v = min(v, alphabeta(result(board, action), alpha, beta, table))
+            beta = min(beta, v)
+            # Max player already has a better option elsewhere
+            if alpha >= beta:
+                break
+
+    if table is not None:
+        # Outside the window, v is only a bound on the true value
+        if v <= window[0]:
+            table[key] = (v, UPPER)
+        elif v >= window[1]:
+            table[key] = (v, LOWER)
+        else:
+            table[key] = (v, EXACT)
+    return v
+
+
+def best_action(board, table=transposition_table):
+    """
+    Returns (value, action) for the player to move, in a single
+    alpha-beta pass over the board's children.
+    """
+    maximizing = player(board) == X
+    alpha, beta = -math.inf, math.inf
+    best = None
+    for action in ordered_actions(board):
+        v = alphabeta(result(board, action), alpha, beta, table)
+        if maximizing and v > alpha:
+            alpha, best = v, action
+        elif not maximizing and v < beta:
+            beta, best = v, action
+        # A win cannot be improved on
+        if (maximizing and v == 1) or (not maximizing and v == -1):
+            break
+    return (alpha if maximizing else beta), best
+
+
+def board_code(board):
+    """
+    Returns the board as a base-3 number, one digit per cell in reading
+    order: 0 for empty, 1 for X and 2 for O.
+    """
+    code = 0
+    for row in board:
+        for cell in row:
+            code = 3 * code + (1 if cell == X else 2 if cell == O else 0)
+    return code
+
+
+def load_book(path=BOOK_FILE):
+    """
+    Returns the opening book at path as an array of entries indexed by
+    board_code, or None if there is no valid book.
+
+    Each entry holds the cells of every optimal move as a 9-bit mask,
+    with the minimax value plus 2 above it; 0 marks positions that are
+    unreachable or already over.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(BOOK_MAGIC)] != BOOK_MAGIC:
+        return None
+    entries = array("H")
+    entries.frombytes(data[len(BOOK_MAGIC):])
+    if len(entries) != BOOK_SIZE:
+        return None
+    return entries
+
+
+# Opening book, if book.py has been run
+book = load_book()
+
+
+def book_moves(board):
+    """
+    Returns (value, optimal actions) for the board from the opening
+    book, or None if there is no book or no entry for the board.
+    """
+    if book is None:
+        return None
+    entry = book[board_code(board)]
+    if entry == 0:
+        return None
+    mask = entry & 0b111111111
+    moves = [(i, j) for i, j in MOVE_ORDER if mask >> (3 * i + j) & 1]
+    return (entry >> 9) - 2, moves
+
+
 def minimax(board):
     """
     Returns the optimal action for the current player on the board.
+
+    Looks the board up in the opening book when there is one, so a move
+    takes constant time, and searches otherwise.
+    """
+    if terminal(board):
+        return None
+    entry = book_moves(board)
+    if entry is not None:
+        return entry[1][0]
+    return best_action(board)[1]
+
+
+def exhaustive_minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    using the full minimax search without pruning.
     """
     # Consider is ai is X or O for right utility values
     ai = player(board)
@@ -197,7 +413,3 @@ def minimax(board):
         for action in actions(board):
             if min_action == max_value(result(board, action)):
                 return action
-        
-          
-    
-        
@@ -0,0 +1,342 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import logic
+import puzzle
+import sat
+from logic import *
+
+
+def main():
+    if len(sys.argv) not in [2, 3] or sys.argv[1] not in BENCHMARKS:
+        choices = "|".join(BENCHMARKS)
+        sys.exit(f"Usage: python benchmark.py [{choices}] [people]")
+    if len(sys.argv) == 3:
+        BENCHMARKS[sys.argv[1]](int(sys.argv[2]))
+    else:
+        BENCHMARKS[sys.argv[1]]()
+
+
+def puzzles():
+    """
+    Returns (name, knowledge, symbols) for each puzzle in puzzle.py.
+    """
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    return [
+        ("Puzzle 0", puzzle.knowledge0, symbols),
+        ("Puzzle 1", puzzle.knowledge1, symbols),
+        ("Puzzle 2", puzzle.knowledge2, symbols),
+        ("Puzzle 3", puzzle.knowledge3, symbols),
+    ]
+
+
+def generate(people, seed=0):
+    """
+    Returns (knowledge, symbols) for a puzzle in the style of puzzle.py
+    with the given number of people, two symbols each. Everyone makes
+    a random statement about up to three others that is true if they
+    are a knight and false if they are a knave, so it has a solution.
+    """
+    rng = random.Random(seed)
+    knights = [Symbol(f"{i} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(people)]
+    truth = {}
+    for i in range(people):
+        knight = rng.random() < 0.5
+        truth[knights[i].name] = knight
+        truth[knaves[i].name] = not knight
+
+    def statement(depth):
+        if depth == 0 or rng.random() < 0.3:
+            other = rng.randrange(people)
+            return rng.choice([knights, knaves])[other]
+        kind = rng.randrange(4)
+        if kind == 0:
+            return Not(statement(depth - 1))
+        elif kind == 1:
+            return And(statement(depth - 1), statement(depth - 1))
+        elif kind == 2:
+            return Or(statement(depth - 1), statement(depth - 1))
+        return Biconditional(statement(depth - 1), statement(depth - 1))
+
+    conjuncts = []
+    for i in range(people):
+        # Knight or Knave not Both
+        conjuncts.append(And(Or(knights[i], knaves[i]),
+                             Not(And(knights[i], knaves[i]))))
+        said = statement(2)
+        if said.evaluate(truth) != truth[knights[i].name]:
+            said = Not(said)
+        conjuncts.append(Implication(knights[i], said))
+        conjuncts.append(Implication(knaves[i], Not(said)))
+    return And(*conjuncts), knights + knaves
+
+
+def ask_all(check, knowledge, symbols):
+    """
+    Returns the symbols check says knowledge entails, and the seconds
+    taken to ask about all of them.
+    """
+    start = time.perf_counter()
+    entailed = [symbol for symbol in symbols if check(knowledge, symbol)]
+    return entailed, time.perf_counter() - start
+
+
+def benchmark_sat(people=200):
+    """
+    Compares model_check with the SAT backend on the puzzles and on
+    generated puzzles, checking that both give the same answers where
+    model_check can finish.
+    """
+    cases = puzzles() + [
+        (f"{n} people", *generate(n)) for n in [4, 6, 8]
+    ]
+    for name, knowledge, symbols in cases:
+        expected, enumerated = ask_all(model_check, knowledge, symbols)
+        entailed, solved = ask_all(sat.entails, knowledge, symbols)
+        if entailed != expected:
+            sys.exit(f"{name}: SAT backend disagrees with model_check")
+        print(f"{name:>12}: {len(symbols):>4} symbols, model_check "
+              f"{1000 * enumerated:9.2f}ms, sat {1000 * solved:8.2f}ms")
+
+    for n in [people // 2, people]:
+        knowledge, symbols = generate(n)
+        entailed, solved = ask_all(sat.entails, knowledge, symbols)
+        print(f"{n:>5} people: {len(symbols):>4} symbols, "
+              f"{len(entailed)} entailed, sat {solved:.2f}s "
+              f"({1000 * solved / len(symbols):.2f}ms per query)")
+
+
+def benchmark_compile(people=8):
+    """
+    Compares Sentence.evaluate on dict models with compiled sentences
+    on bit-packed models, evaluating a knowledge base on every model.
+    """
+    cases = puzzles() + [(f"{people} people", *generate(people))]
+    for name, knowledge, _ in cases:
+        names = sorted(knowledge.symbols())
+        index = {symbol: i for i, symbol in enumerate(names)}
+
+        models = [
+            {symbol: bool(model >> i & 1) for i, symbol in enumerate(names)}
+            for model in range(2 ** len(names))
+        ]
+        start = time.perf_counter()
+        evaluated = [knowledge.evaluate(model) for model in models]
+        interpreted = time.perf_counter() - start
+
+        start = time.perf_counter()
+        compiled = knowledge.compile(index)
+        compiling = time.perf_counter() - start
+        start = time.perf_counter()
+        results = [bool(compiled(model)) for model in range(len(models))]
+        seconds = time.perf_counter() - start
+
+        if results != evaluated:
+            sys.exit(f"{name}: compiled sentence disagrees with evaluate")
+        print(f"{name:>12}: {len(models):>6} models, evaluate "
+              f"{1e6 * interpreted / len(models):6.2f}us, compiled "
+              f"{1e6 * seconds / len(models):5.2f}us per model "
+              f"({interpreted / seconds:4.1f}x), compiling "
+              f"{1000 * compiling:.2f}ms")
+
+
+def benchmark_vectorized(people=12):
+    """
+    Compares model_check one full model at a time and vectorized with NumPy
+    on generated puzzles, asking about a sentence the knowledge base
+    entails so every model has to be checked.
+    """
+    if logic.numpy is None:
+        sys.exit("The vectorized mode needs numpy.")
+    for n in [8, 10, people]:
+        knowledge, _ = generate(n)
+        query = knowledge.conjuncts[0]
+        timings = []
+        for vectorized in [False, True]:
+            start = time.perf_counter()
+            if not model_check(knowledge, query, vectorized=vectorized,
+                               prune=False):
+                sys.exit(f"{n} people: a conjunct is not entailed")
+            timings.append(time.perf_counter() - start)
+        print(f"{n:>3} people: {2 * n:>3} symbols, model_check "
+              f"{timings[0]:7.2f}s, vectorized {timings[1]:6.2f}s, "
+              f"{timings[0] / timings[1]:5.1f}x")
+
+
+def subsentences(sentence):
+    """
+    Returns every sentence in the tree under sentence, counting shared
+    subsentences once per appearance.
+    """
+    found = []
+    stack = [sentence]
+    while stack:
+        sentence = stack.pop()
+        found.append(sentence)
+        if isinstance(sentence, Not):
+            stack.append(sentence.operand)
+        elif isinstance(sentence, And):
+            stack.extend(sentence.conjuncts)
+        elif isinstance(sentence, Or):
+            stack.extend(sentence.disjuncts)
+        elif isinstance(sentence, Implication):
+            stack.extend([sentence.antecedent, sentence.consequent])
+        elif isinstance(sentence, Biconditional):
+            stack.extend([sentence.left, sentence.right])
+    return found
+
+
+def benchmark_hashing(people=5000):
+    """
+    Measures building a generated knowledge base of about 100k nodes,
+    the memory it holds alone and alongside a rebuilt copy, and hashing
+    it, all its subsentences and its symbols.
+    """
+    # Measure without the sentences of the puzzles and earlier builds
+    logic.clear_interned()
+    tracemalloc.start()
+    knowledge, _ = generate(people)
+    memory = tracemalloc.get_traced_memory()[0]
+    copy, _ = generate(people)
+    both = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    generate(people, seed=1)
+    built = time.perf_counter() - start
+    logic.clear_interned()
+
+    nodes = subsentences(knowledge)
+    distinct = len({id(node) for node in nodes})
+    start = time.perf_counter()
+    for _ in range(10):
+        hash(knowledge)
+    hashed = (time.perf_counter() - start) / 10
+    start = time.perf_counter()
+    unique = len(set(nodes))
+    indexed = time.perf_counter() - start
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        symbols = len(knowledge.symbols())
+        timings.append(time.perf_counter() - start)
+
+    print(f"{len(nodes)} nodes, {distinct} objects, {unique} distinct "
+          f"sentences, {symbols} symbols")
+    print(f"   build: {1000 * built:8.1f}ms")
+    print(f"  memory: {memory / 2 ** 20:8.1f} MiB, "
+          f"{both / 2 ** 20:.1f} MiB with a rebuilt copy")
+    print(f"    hash: {1000 * hashed:8.3f}ms for the knowledge base")
+    print(f"     set: {1000 * indexed:8.1f}ms for every node")
+    print(f" symbols: {1000 * timings[0]:8.1f}ms, then "
+          f"{1000 * timings[1]:.1f}ms")
+
+
+def benchmark_incremental(people=40):
+    """
+    Compares asking every symbol with model_check or sat.entails, which
+    start from scratch each time, with one KnowledgeBase asked about all
+    of them, and with the same KnowledgeBase asked about one.
+    """
+    cases = puzzles() + [
+        (f"{n} people", *generate(n)) for n in [8, 20, people]
+    ]
+    for name, knowledge, symbols in cases:
+        checks = [("sat", sat.entails)]
+        if len(knowledge.symbols()) <= 16:
+            checks.insert(0, ("model_check", model_check))
+        timings = []
+        for check_name, check in checks:
+            expected, seconds = ask_all(check, knowledge, symbols)
+            timings.append(f"{check_name} {1000 * seconds:.1f}ms")
+
+        # Start both from nothing compiled
+        logic.compile_expression.cache_clear()
+        start = time.perf_counter()
+        base = KnowledgeBase(knowledge)
+        base.ask(symbols[0])
+        one = time.perf_counter() - start
+        logic.compile_expression.cache_clear()
+        start = time.perf_counter()
+        base = KnowledgeBase(knowledge)
+        entailed = [symbol for symbol in symbols if base.ask(symbol)]
+        every = time.perf_counter() - start
+        if entailed != expected:
+            sys.exit(f"{name}: KnowledgeBase disagrees with sat.entails")
+
+        # Too many models to keep means KnowledgeBase used model_check
+        models = "-" if base.models is None else len(base.models)
+        print(f"{name:>12}: {len(symbols):>3} symbols, "
+              f"{models:>3} models; all by "
+              f"{', '.join(timings)}; KnowledgeBase one "
+              f"{1000 * one:.1f}ms, all {1000 * every:.1f}ms")
+
+
+def benchmark_pruning(people=10):
+    """
+    Compares the models and partial models model_check visits with and
+    without pruning by partial evaluation, asking about every symbol.
+    """
+    cases = puzzles() + [
+        (f"{n} people", *generate(n)) for n in [8, 10, people]
+    ]
+    for name, knowledge, symbols in cases:
+        results = []
+        for prune in [False, True]:
+            logic.nodes_checked = 0
+            start = time.perf_counter()
+            entailed = [symbol for symbol in symbols
+                        if model_check(knowledge, symbol, prune=prune)]
+            seconds = time.perf_counter() - start
+            results.append((entailed, logic.nodes_checked, seconds))
+        if results[0][0] != results[1][0]:
+            sys.exit(f"{name}: pruning changed the answers")
+        (_, full, slow), (_, pruned, fast) = results
+        print(f"{name:>12}: {len(symbols):>3} symbols, {full:>10} nodes "
+              f"{slow:7.3f}s, pruned {pruned:>7} nodes {fast:7.3f}s "
+              f"({full / pruned:6.1f}x fewer)")
+
+
+def benchmark_parallel(people=13):
+    """
+    Times model_check over every model, with no pruning, of a generated
+    puzzle with one to four worker processes, for an entailed sentence
+    (every prefix checked) and a symbol that is not entailed (workers
+    cancelled at the first counterexample).
+    """
+    knowledge, symbols = generate(people)
+    entailed = knowledge.conjuncts[0]
+    refuted = next(symbol for symbol in symbols
+                   if not sat.entails(knowledge, symbol))
+    print(f"{people} people, {2 * people} symbols, "
+          f"{os.cpu_count()} CPUs")
+    for workers in [1, 2, 4]:
+        timings = []
+        for query, expected in [(entailed, True), (refuted, False)]:
+            start = time.perf_counter()
+            if model_check(knowledge, query, prune=False,
+                           workers=workers) != expected:
+                sys.exit(f"{workers} workers: wrong answer")
+            timings.append(time.perf_counter() - start)
+        print(f"{workers} workers: entailed {timings[0]:7.2f}s, "
+              f"not entailed {timings[1]:6.2f}s")
+
+
+BENCHMARKS = {
+    "sat": benchmark_sat,
+    "compile": benchmark_compile,
+    "vectorized": benchmark_vectorized,
+    "hashing": benchmark_hashing,
+    "incremental": benchmark_incremental,
+    "pruning": benchmark_pruning,
+    "parallel": benchmark_parallel,
+}
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,75 @@
 import itertools
+import multiprocessing
+from functools import lru_cache
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The vectorized model_check evaluates 2 ** BLOCK_BITS models at once
+BLOCK_BITS = 20
+
+# Truth values of sentences under partial models: true in every way of
+# completing the model, false in every way, or not yet known
+TRUE = 2
+UNKNOWN = 1
+FALSE = 0
+
+# Models and partial models visited by model_check, for benchmarking
+nodes_checked = 0
+
+# Prefixes of symbols handed to each worker by the parallel model_check
+TASKS_PER_WORKER = 8
+
+# Most models a KnowledgeBase keeps before answering with model_check
+MAX_MODELS = 2 ** 18
 
 
 class Sentence():
+    """Sentences are immutable and hash-consed: building a sentence equal
+    to one already built returns that object, so identical subsentences
+    are shared, and hashes and symbols are computed once per sentence.
+
+    The table of sentences built is never pruned by itself, so every
+    sentence stays in memory, used or not, until clear_interned is
+    called."""
+
+    __slots__ = ("_hash", "_symbols")
+
+    # Every sentence built, mapped to itself
+    interned = {}
+
+    @classmethod
+    def intern(cls, *parts):
+        """Returns the sentence of this class with the given parts, one
+        per slot, making it only if there is none yet."""
+        sentence = object.__new__(cls)
+        assign = object.__setattr__
+        for name, part in zip(cls.__slots__, parts):
+            assign(sentence, name, part)
+        assign(sentence, "_hash", hash((cls.__name__, *parts)))
+        assign(sentence, "_symbols", None)
+        return Sentence.interned.setdefault(sentence, sentence)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("sentences are immutable")
+
+    def __eq__(self, other):
+        # Parts are shared, so comparing them rarely goes deeper
+        return self is other or (
+            type(self) is type(other) and self._hash == other._hash
+            and all(getattr(self, name) == getattr(other, name)
+                    for name in type(self).__slots__)
+        )
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        # Unpickled and copied sentences are interned like new ones
+        return (type(self), tuple(getattr(self, name)
+                                  for name in type(self).__slots__))
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -13,7 +81,67 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns a frozenset of all symbols in the logical sentence,
+        found once and then kept with the sentence."""
+        if self._symbols is None:
+            object.__setattr__(self, "_symbols", self.find_symbols())
+        return self._symbols
+
+    def find_symbols(self):
+        return frozenset()
+
+    def expression(self, index):
+        """Returns Python source evaluating the sentence on a bit-packed
+        model, where symbol name is true if bit index[name] is set."""
+        raise Exception("nothing to evaluate")
+
+    def compile(self, index):
+        """Returns a function of a bit-packed model (see expression) that
+        gives the truth of the logical sentence, several times faster
+        than evaluate."""
+        return self.compile_parts("expression", compile_expression, index)
+
+    def column_expression(self, index):
+        """Returns NumPy source evaluating the sentence on many models at
+        once, where columns[index[name]] holds symbol name's values."""
+        raise Exception("nothing to evaluate")
+
+    def vectorize(self, index):
+        """Returns a function of columns (see column_expression) that
+        gives the truth of the logical sentence in every model."""
+        return self.compile_parts("column_expression", compile_columns, index)
+
+    def partial_expression(self, index):
+        """Returns Python source giving TRUE, FALSE or UNKNOWN for the
+        sentence under a partial model, where symbol name is assigned if
+        bit index[name] of known is set, with its value in model."""
+        raise Exception("nothing to evaluate")
+
+    def compile_partial(self, index):
+        """Returns a function of model and known (see partial_expression)
+        that gives the truth of the logical sentence, if already decided
+        by the symbols assigned so far."""
+        return self.compile_parts("partial_expression",
+                                  compile_partial_expression, index)
+
+    def compile_parts(self, source, compiler, index):
+        """Returns compiler applied to the source given by the method
+        named source. Python cannot compile source nested more than a
+        couple of hundred levels deep, so a sentence that deep has each
+        of its operands compiled on its own, and calls them instead."""
+        try:
+            return compiler(getattr(self, source)(index))
+        except (SyntaxError, RecursionError, MemoryError):
+            if isinstance(self, Symbol):
+                raise
+        operands = self.__reduce__()[1]
+        parts = tuple(operand.compile_parts(source, compiler, index)
+                      for operand in operands)
+        stand_in = type(self)(*[Compiled(i) for i in range(len(parts))])
+        return compiler(getattr(stand_in, source)(index), parts)
 
     @classmethod
     def validate(cls, sentence):
@@ -42,16 +170,50 @@ class Sentence():
             return f"({s})"
 
 
-class Symbol(Sentence):
+@lru_cache(maxsize=256)
+def compile_expression(expression, parts=()):
+    """Returns a function of model that evaluates expression, reusing it
+    when the same sentence is compiled again. The functions in parts
+    are those of any Compiled stand-ins in expression."""
+    return eval(f"lambda model: {expression}", {"parts": parts})
 
-    def __init__(self, name):
-        self.name = name
 
-    def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+@lru_cache(maxsize=256)
+def compile_columns(expression, parts=()):
+    """Returns a function of columns that evaluates expression."""
+    if numpy is None:
+        raise Exception("vectorized evaluation needs numpy")
+    constants = {"TRUE": numpy.True_, "FALSE": numpy.False_,
+                 "parts": parts}
+    return eval(f"lambda columns: {expression}", constants)
 
-    def __hash__(self):
-        return hash(("symbol", self.name))
+
+@lru_cache(maxsize=256)
+def compile_partial_expression(expression, parts=()):
+    """Returns a function of model and known that evaluates expression."""
+    return eval(f"lambda model, known: {expression}",
+                {"iff": iff, "parts": parts})
+
+
+def clear_interned():
+    """Forgets every sentence built so far, freeing those no longer used
+    elsewhere. Sentences still in use keep working, but new sentences
+    equal to them are separate objects."""
+    Sentence.interned.clear()
+
+
+def iff(left, right):
+    """Returns the truth of left <=> right for partial truth values."""
+    if left == UNKNOWN or right == UNKNOWN:
+        return UNKNOWN
+    return TRUE if left == right else FALSE
+
+
+class Symbol(Sentence):
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        return cls.intern(name)
 
     def __repr__(self):
         return self.name
@@ -65,20 +227,36 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def find_symbols(self):
+        return frozenset((self.name,))
 
+    def expression(self, index):
+        try:
+            return f"(model & {1 << index[self.name]})"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
-class Not(Sentence):
-    def __init__(self, operand):
-        Sentence.validate(operand)
-        self.operand = operand
+    def column_expression(self, index):
+        try:
+            return f"columns[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
-    def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+    def partial_expression(self, index):
+        try:
+            bit = 1 << index[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+        return (f"({UNKNOWN} if not known & {bit} "
+                f"else {TRUE} if model & {bit} else {FALSE})")
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+
+class Not(Sentence):
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
+        Sentence.validate(operand)
+        return cls.intern(operand)
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -89,23 +267,29 @@ class Not(Sentence):
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def find_symbols(self):
+        return self.operand.symbol_set()
+
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def column_expression(self, index):
+        return f"(~{self.operand.column_expression(index)})"
+
+    def partial_expression(self, index):
+        return f"({TRUE} - {self.operand.partial_expression(index)})"
 
 
 class And(Sentence):
-    def __init__(self, *conjuncts):
+    __slots__ = ("conjuncts",)
+
+    def __new__(cls, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
-        self.conjuncts = list(conjuncts)
-
-    def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return cls.intern(conjuncts)
 
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+    def __reduce__(self):
+        return (And, self.conjuncts)
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,8 +298,8 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
-        Sentence.validate(conjunct)
-        self.conjuncts.append(conjunct)
+        raise TypeError("sentences are immutable, use "
+                        "And(*knowledge.conjuncts, conjunct) instead")
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
@@ -126,23 +310,45 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[conjunct.symbol_set() for conjunct in self.conjuncts]
+        )
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            [conjunct.expression(index) for conjunct in self.conjuncts]
+        ) + ")"
+
+    def column_expression(self, index):
+        if not self.conjuncts:
+            return "TRUE"
+        return "(" + " & ".join(
+            [conjunct.column_expression(index)
+             for conjunct in self.conjuncts]
+        ) + ")"
+
+    def partial_expression(self, index):
+        if not self.conjuncts:
+            return str(TRUE)
+        return "min(" + ", ".join(
+            [conjunct.partial_expression(index)
+             for conjunct in self.conjuncts]
+        ) + f", {TRUE})"
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        return cls.intern(disjuncts)
 
-    def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+    def __reduce__(self):
+        return (Or, self.disjuncts)
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -157,24 +363,42 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def find_symbols(self):
+        return frozenset().union(
+            *[disjunct.symbol_set() for disjunct in self.disjuncts]
+        )
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            [disjunct.expression(index) for disjunct in self.disjuncts]
+        ) + ")"
+
+    def column_expression(self, index):
+        if not self.disjuncts:
+            return "FALSE"
+        return "(" + " | ".join(
+            [disjunct.column_expression(index)
+             for disjunct in self.disjuncts]
+        ) + ")"
+
+    def partial_expression(self, index):
+        if not self.disjuncts:
+            return str(FALSE)
+        return "max(" + ", ".join(
+            [disjunct.partial_expression(index)
+             for disjunct in self.disjuncts]
+        ) + f", {FALSE})"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
-
-    def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
-
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return cls.intern(antecedent, consequent)
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -188,24 +412,32 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def find_symbols(self):
+        return self.antecedent.symbol_set() | self.consequent.symbol_set()
+
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def column_expression(self, index):
+        antecedent = self.antecedent.column_expression(index)
+        consequent = self.consequent.column_expression(index)
+        return f"(~{antecedent} | {consequent})"
+
+    def partial_expression(self, index):
+        antecedent = self.antecedent.partial_expression(index)
+        consequent = self.consequent.partial_expression(index)
+        return f"max({TRUE} - {antecedent}, {consequent})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
-
-    def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
-
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return cls.intern(left, right)
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -221,43 +453,276 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def find_symbols(self):
+        return self.left.symbol_set() | self.right.symbol_set()
 
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+    def column_expression(self, index):
+        left = self.left.column_expression(index)
+        right = self.right.column_expression(index)
+        return f"({left} == {right})"
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+    def partial_expression(self, index):
+        left = self.left.partial_expression(index)
+        right = self.right.partial_expression(index)
+        return f"iff({left}, {right})"
 
-        # If model has an assignment for each symbol
-        if not symbols:
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+class Compiled(Sentence):
+    """Stands in for the operand of a sentence that was compiled on its
+    own, as parts[number] of the compiled sentence."""
+    __slots__ = ("number",)
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+    def __new__(cls, number):
+        return cls.intern(number)
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+    def __repr__(self):
+        return f"Compiled({self.number})"
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    def expression(self, index):
+        return f"parts[{self.number}](model)"
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    def column_expression(self, index):
+        return f"parts[{self.number}](columns)"
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    def partial_expression(self, index):
+        return f"parts[{self.number}](model, known)"
+
+
+def model_check(knowledge, query, vectorized=False, prune=True, workers=1):
+    """Checks if knowledge base entails query.
+
+    If vectorized, checks blocks of models at once with NumPy instead.
+    If prune, stops enumerating as soon as the symbols assigned so far
+    decide the answer for every model that extends them.
+    If workers is more than 1, shares the models out among that many
+    processes."""
+    if vectorized:
+        return vectorized_check(knowledge, query)
+    if workers > 1:
+        return parallel_check(knowledge, query, workers, prune)
 
     # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    return check_models(*compile_check(knowledge, query, prune), prune)
+
+
+def compile_check(knowledge, query, prune):
+    """Returns knowledge and query compiled for check_models, with the
+    number of symbols in both, each given one bit of the model."""
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    index = {symbol: i for i, symbol in enumerate(sorted(symbols))}
+    if prune:
+        return (knowledge.compile_partial(index),
+                query.compile_partial(index), len(symbols))
+    return knowledge.compile(index), query.compile(index), len(symbols)
+
+
+def check_models(knowledge, query, symbols, prune, fixed=0, prefix=0):
+    """Checks if knowledge base entails query in every model where the
+    last fixed symbols to be assigned take their values from prefix."""
+    free = symbols - fixed
+    model = prefix << free
+    if prune:
+        known = ((1 << fixed) - 1) << free
+        return check_partial(knowledge, query, free, model, known)
+    return check_all(knowledge, query, free, model)
+
+
+def check_all(knowledge, query, symbols, model):
+    """Checks if knowledge base entails query, given a particular model."""
+    global nodes_checked
+    nodes_checked += 1
+
+    # If model has an assignment for each symbol
+    if not symbols:
+
+        # If knowledge base is true in model, then query must also be true
+        if knowledge(model):
+            return bool(query(model))
+        return True
+    else:
+
+        # Choose one of the remaining unused symbols, which is bit
+        # symbols - 1 of the model
+        remaining = symbols - 1
+
+        # Create a model where the symbol is true
+        model_true = model | (1 << remaining)
+
+        # Create a model where the symbol is false
+        model_false = model
+
+        # Ensure entailment holds in both models
+        return (check_all(knowledge, query, remaining, model_true) and
+                check_all(knowledge, query, remaining, model_false))
+
+
+def check_partial(knowledge, query, symbols, model, known):
+    """Checks if knowledge base entails query, in every model that
+    extends the partial model."""
+    global nodes_checked
+    nodes_checked += 1
+
+    # Nothing extending a model where knowledge is false matters
+    truth = knowledge(model, known)
+    if truth == FALSE:
+        return True
+
+    # Query is true however the remaining symbols are assigned
+    implied = query(model, known)
+    if implied == TRUE:
+        return True
+
+    # Knowledge is true and query false in every extension, which
+    # is always the case in a full model that gets this far
+    if truth == TRUE and implied == FALSE:
+        return False
+
+    # Assign the next symbol both ways
+    remaining = symbols - 1
+    bit = 1 << remaining
+    return (check_partial(knowledge, query, remaining,
+                          model | bit, known | bit) and
+            check_partial(knowledge, query, remaining,
+                          model, known | bit))
+
+
+def parallel_check(knowledge, query, workers, prune=True):
+    """Checks if knowledge base entails query with a pool of worker
+    processes, each checking the models that extend one assignment of
+    the first symbols at a time. Stops every worker once one of them
+    finds a model where knowledge is true and query is false."""
+    global nodes_checked
+    symbols = len(set.union(knowledge.symbols(), query.symbols()))
+
+    # Several prefixes per worker, as some take far longer than others
+    fixed = min(symbols, (TASKS_PER_WORKER * workers - 1).bit_length())
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        return model_check(knowledge, query, prune=prune)
+
+    with context.Pool(workers, initializer=start_worker,
+                      initargs=(knowledge, query, prune)) as pool:
+        tasks = [(fixed, prefix) for prefix in range(2 ** fixed)]
+        for entailed, nodes in pool.imap_unordered(check_worker, tasks):
+            nodes_checked += nodes
+            if not entailed:
+                # Leaving the pool terminates the workers still checking
+                return False
+    return True
+
+
+# Compiled knowledge and query of a parallel_check worker process
+worker_check = None
+
+
+def start_worker(knowledge, query, prune):
+    """Compiles knowledge and query once per worker process."""
+    global worker_check
+    worker_check = (*compile_check(knowledge, query, prune), prune)
+
+
+def check_worker(task):
+    """Checks the models extending one prefix, as given by task, and
+    returns the answer with the number of nodes visited."""
+    global nodes_checked
+    nodes_checked = 0
+    entailed = check_models(*worker_check, *task)
+    return entailed, nodes_checked
+
+
+def vectorized_check(knowledge, query, block_bits=BLOCK_BITS):
+    """Checks if knowledge base entails query, 2 ** block_bits models at a
+    time: the first block_bits symbols take every combination of values
+    down NumPy boolean columns, and the rest are fixed for each block."""
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    knowledge = knowledge.vectorize(index)
+    query = query.vectorize(index)
+
+    # Columns for the symbols that vary within a block
+    low = min(len(symbols), block_bits)
+    rows = numpy.arange(2 ** low)
+    columns = [(rows >> i & 1).astype(bool) for i in range(low)]
+    columns += [None] * (len(symbols) - low)
+
+    for block in range(2 ** (len(symbols) - low)):
+        for i in range(low, len(symbols)):
+            columns[i] = numpy.bool_(block >> (i - low) & 1)
+
+        # A model where knowledge is true and query false is a
+        # counterexample
+        if numpy.any(knowledge(columns) & ~query(columns)):
+            return False
+    return True
+
+
+class KnowledgeBase():
+    """A knowledge base that grows one sentence at a time, keeping every
+    model of its symbols in which all its sentences are true.
+
+    Each sentence narrows down the models already found, so the work of
+    enumerating them is done once and shared by every later query. Once
+    there would be more than MAX_MODELS of them, it stops keeping models
+    and answers with model_check instead."""
+
+    def __init__(self, *sentences):
+        self.sentences = []
+        self.index = {}
+
+        # Satisfying models, bit-packed as for Sentence.compile, or None
+        # once there are too many to keep
+        self.models = [0]
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def add(self, sentence):
+        """Adds sentence to the knowledge base."""
+        Sentence.validate(sentence)
+
+        # Conjuncts one by one, so models are dropped as early as possible
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+            return
+
+        self.sentences.append(sentence)
+        if self.models is None:
+            return
+        models = extend_models(self.models, self.index, sentence.symbol_set())
+        if models is None:
+            self.models = None
+            return
+        check = sentence.compile(self.index)
+        self.models = [model for model in models if check(model)]
+
+    def ask(self, query):
+        """Checks if knowledge base entails query."""
+        Sentence.validate(query)
+        if self.models is not None:
+            index = dict(self.index)
+            models = extend_models(self.models, index, query.symbol_set())
+            if models is not None:
+                check = query.compile(index)
+                return all(check(model) for model in models)
+        return model_check(And(*self.sentences), query)
+
+
+def extend_models(models, index, symbols):
+    """Adds the symbols not yet in index to it, one bit each, and returns
+    models with every combination of values for them, or None, leaving
+    index as it was, if there would be more than MAX_MODELS."""
+    symbols = sorted(symbols - index.keys())
+    if len(models) << len(symbols) > MAX_MODELS:
+        return None
+    for symbol in symbols:
+        bit = 1 << len(index)
+        index[symbol] = len(index)
+        models = models + [model | bit for model in models]
+    return models
@@ -87,8 +87,10 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            # Models of the knowledge are found once for every symbol
+            knowledge = KnowledgeBase(knowledge)
             for symbol in symbols:
-                if model_check(knowledge, symbol):
+                if knowledge.ask(symbol):
                     print(f"    {symbol}")
 
 
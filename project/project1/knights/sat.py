@@ -0,0 +1,393 @@
+"""
+SAT-based entailment for logic.py sentences
+
+Sentences are turned into clauses by the Tseitin encoding, which gives
+every compound subsentence its own variable, so the clauses grow only
+linearly with the sentence. A CDCL solver then decides them: unit
+propagation over two watched literals per clause, learning a clause
+from every conflict and jumping back to where it becomes unit.
+
+A knowledge base entails a query exactly when the knowledge base and
+the negated query cannot both be true.
+"""
+
+import heapq
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+def entails(knowledge, query):
+    """
+    Checks if knowledge base entails query, like logic.model_check.
+    """
+    solver = Solver()
+    encoder = Encoder(solver)
+    encoder.add(knowledge)
+    return not solver.solve([-encoder.literal(query)])
+
+
+class Encoder():
+    """
+    Adds sentences to a solver as clauses over integer variables.
+
+    Literals are nonzero ints: variable v is true as v and false as -v.
+    Symbols are given variables by name, and identical subsentences
+    share one variable.
+    """
+
+    def __init__(self, solver):
+        self.solver = solver
+        self.variables = {}
+        self.literals = {}
+
+    def variable(self, name):
+        """
+        Returns the variable for the symbol called name.
+        """
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_variable()
+        return self.variables[name]
+
+    def add(self, sentence):
+        """
+        Adds clauses that hold exactly when sentence is true.
+
+        Top-level conjunctions and disjunctions become clauses directly,
+        without variables of their own.
+        """
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.solver.add_clause(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.solver.add_clause([-self.literal(sentence.antecedent),
+                                    self.literal(sentence.consequent)])
+        else:
+            self.solver.add_clause([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is, adding
+        the clauses that define it the first time it is seen.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        add_clause = self.solver.add_clause
+        if isinstance(sentence, And):
+            children = [self.literal(part) for part in sentence.conjuncts]
+            literal = self.solver.new_variable()
+            for child in children:
+                add_clause([-literal, child])
+            add_clause([literal] + [-child for child in children])
+        elif isinstance(sentence, Or):
+            children = [self.literal(part) for part in sentence.disjuncts]
+            literal = self.solver.new_variable()
+            for child in children:
+                add_clause([literal, -child])
+            add_clause([-literal] + children)
+        elif isinstance(sentence, Implication):
+            literal = self.literal(Or(Not(sentence.antecedent),
+                                      sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.solver.new_variable()
+            add_clause([-literal, -left, right])
+            add_clause([-literal, left, -right])
+            add_clause([literal, left, right])
+            add_clause([literal, -left, -right])
+        else:
+            raise TypeError("must be a logical sentence")
+        self.literals[sentence] = literal
+        return literal
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver.
+
+    Clauses may be added between calls to solve, and clauses learned in
+    one call are kept for the next.
+    """
+
+    def __init__(self):
+        # Per variable, indexed from 1: 1 true, -1 false, 0 unassigned
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [-1]
+
+        # Clauses watching each literal, keyed by the literal
+        self.watches = {}
+        self.learned = []
+        self.trail = []
+        self.trail_limits = []
+        self.propagated = 0
+        self.unsatisfiable = False
+
+        self.order = []
+        self.increment = 1.0
+        self.conflicts = 0
+        self.decisions = 0
+
+    def new_variable(self):
+        """
+        Returns a new variable, numbered from 1.
+        """
+        self.values.append(0)
+        self.levels.append(0)
+        self.reasons.append(None)
+        self.activity.append(0.0)
+        self.phases.append(-1)
+        variable = len(self.values) - 1
+        self.watches[variable] = []
+        self.watches[-variable] = []
+        heapq.heappush(self.order, (0.0, variable))
+        return variable
+
+    def value(self, literal):
+        """
+        Returns 1 if literal is true, -1 if false and 0 if unassigned.
+        """
+        if literal > 0:
+            return self.values[literal]
+        return -self.values[-literal]
+
+    def add_clause(self, clause):
+        """
+        Adds a clause, a list of literals of which at least one is true.
+        """
+        self.cancel_until(0)
+        if self.unsatisfiable:
+            return
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            return
+        # Facts already known at the top level can be dropped
+        if any(self.value(literal) == 1 for literal in clause):
+            return
+        clause = [literal for literal in clause if self.value(literal) == 0]
+        if not clause:
+            self.unsatisfiable = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.unsatisfiable = True
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.trail_limits)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by a clause with only one literal
+        left unassigned, and returns a clause with every literal false,
+        or None if there is none.
+
+        Each clause watches two of its literals, kept at the front; it
+        can only become unit or false when one of those becomes false.
+        """
+        values = self.values
+        watches = self.watches
+        trail = self.trail
+        while self.propagated < len(trail):
+            false = -trail[self.propagated]
+            self.propagated += 1
+            watching = watches[false]
+            watches[false] = kept = []
+            for index, clause in enumerate(watching):
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                value = values[first] if first > 0 else -values[-first]
+                if value == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal to watch instead
+                for k in range(2, len(clause)):
+                    other = clause[k]
+                    if (values[other] if other > 0 else -values[-other]) \
+                            != -1:
+                        clause[1], clause[k] = other, false
+                        watches[other].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value == -1:
+                        kept.extend(watching[index + 1:])
+                        self.propagated = len(trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the clause learned from a conflict and the level to jump
+        back to, resolving the conflict with the reasons for the current
+        level's assignments until one literal of that level is left.
+        """
+        levels = self.levels
+        level = len(self.trail_limits)
+        seen = set()
+        learned = [None]
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                variable = abs(other)
+                if variable not in seen and levels[variable] > 0:
+                    seen.add(variable)
+                    self.bump(variable)
+                    if levels[variable] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reasons[abs(literal)]
+            pending -= 1
+            if pending == 0:
+                break
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal that will be unassigned last
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, levels[abs(learned[1])]
+
+    def bump(self, variable):
+        """
+        Raises the priority of a variable involved in a conflict.
+        """
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-a, v) for v, a in enumerate(self.activity)
+                          if v > 0 and self.values[v] == 0]
+            heapq.heapify(self.order)
+        elif self.values[variable] == 0:
+            heapq.heappush(self.order,
+                           (-self.activity[variable], variable))
+
+    def cancel_until(self, level):
+        """
+        Undoes every assignment made above level.
+        """
+        if len(self.trail_limits) <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order,
+                           (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.propagated = start
+
+    def decide(self):
+        """
+        Returns the unassigned variable most involved in recent
+        conflicts, or None if every variable is assigned.
+        """
+        while self.order:
+            activity, variable = heapq.heappop(self.order)
+            if self.values[variable] == 0:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses can all be true with every literal
+        in assumptions true, and False otherwise.
+
+        After True, model() gives a satisfying assignment.
+        """
+        if self.unsatisfiable:
+            return False
+        self.cancel_until(0)
+        if self.propagate() is not None:
+            self.unsatisfiable = True
+            return False
+
+        restart = 100
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if not self.trail_limits:
+                    self.unsatisfiable = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watches[learned[0]].append(learned)
+                    self.watches[learned[1]].append(learned)
+                    self.learned.append(learned)
+                    self.assign(learned[0], learned)
+                self.increment *= 1.05
+                continue
+
+            if conflicts >= restart:
+                # Start over, keeping what was learned
+                conflicts = 0
+                restart = int(restart * 1.5)
+                self.cancel_until(0)
+                continue
+
+            # Assumptions come first, one decision level each
+            level = len(self.trail_limits)
+            if level < len(assumptions):
+                literal = assumptions[level]
+                value = self.value(literal)
+                if value == -1:
+                    self.cancel_until(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(variable * self.phases[variable], None)
+
+    def model(self):
+        """
+        Returns the value of every variable after solve returned True,
+        as a list indexed by variable.
+        """
+        return [value == 1 for value in self.values]